@@ -3,6 +3,7 @@ from .order import OrderForm
 from .door import DoorForm
 from .drawer import DrawerForm
 from .generic import GenericItemForm
+from .pricing import PricingSimulationForm, PriceSheetForm
 
 __all__ = [
     'CustomerForm',
@@ -12,4 +13,6 @@ __all__ = [
     'DoorForm',
     'DrawerForm',
     'GenericItemForm',
+    'PricingSimulationForm',
+    'PriceSheetForm',
 ]
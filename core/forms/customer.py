@@ -54,6 +54,18 @@ class CustomerForm(forms.ModelForm):
         initial=0,
         required=False
     )
+    # Editing only: recalculate the customer's quotes when TOTALS_FIELDS change
+    update_open_quotes = forms.BooleanField(
+        required=False,
+        initial=True,
+        label="Recalculate this customer's open quotes with the new discount, surcharge, shipping and tax settings"
+    )
+
+    # Fields that order and quote totals are derived from
+    TOTALS_FIELDS = (
+        'discount_type', 'discount_value', 'surcharge_type', 'surcharge_value',
+        'shipping_type', 'shipping_value', 'taxable', 'tax_percentage',
+    )
 
     class Meta:
         model = Customer
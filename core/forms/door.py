@@ -2,8 +2,9 @@ from django import forms
 from django.forms import ModelForm
 from ..models.door import (
     DoorLineItem, WoodStock, EdgeProfile, 
-    PanelRise, Style, RailDefaults
+    PanelRise, Style
 )
+from ..services.settings_registry import get_rail_defaults
 from decimal import Decimal
 
 class DoorForm(ModelForm):
@@ -112,7 +113,7 @@ class DoorForm(ModelForm):
         super().__init__(*args, **kwargs)
         
         # Get rail defaults
-        rail_defaults = RailDefaults.objects.first()
+        rail_defaults = get_rail_defaults()
         
         # Set initial values for rail dimensions from defaults
         if rail_defaults:
@@ -5,11 +5,15 @@ from django.utils import timezone
 
 class OrderForm(forms.ModelForm):
     is_quote = forms.BooleanField(required=False, widget=forms.HiddenInput())
+    # Version of the order the edit started from, checked when it is saved
+    version = forms.IntegerField(required=False, widget=forms.HiddenInput())
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         if not self.instance.pk:
             self.initial['order_date'] = timezone.localdate()
+        else:
+            self.initial.setdefault('version', self.instance.version)
 
     class Meta:
         model = Order
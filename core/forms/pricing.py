@@ -0,0 +1,236 @@
+from django import forms
+from ..models.door import WoodStock, Style, PanelRise
+from ..models.drawer import DrawerWoodStock, DrawerBottomSize
+
+
+class PricingSimulationForm(forms.Form):
+    """Proposed pricing changes for the what-if repricing simulator"""
+    PANEL_CHOICES = [
+        ('both', 'Raised & flat panel'),
+        ('raised', 'Raised panel'),
+        ('flat', 'Flat panel'),
+    ]
+
+    months = forms.IntegerField(
+        min_value=1,
+        max_value=120,
+        initial=12,
+        label="Orders From the Last (months)"
+    )
+    door_wood_stock = forms.ModelChoiceField(
+        queryset=WoodStock.objects.all(),
+        required=False,
+        empty_label="All wood stocks",
+        label="Door Wood Stock"
+    )
+    door_panel = forms.ChoiceField(
+        choices=PANEL_CHOICES,
+        initial='both',
+        label="Door Panel Price"
+    )
+    door_wood_percent = forms.DecimalField(
+        max_digits=6,
+        decimal_places=2,
+        required=False,
+        label="Door Wood Price Change (%)"
+    )
+    drawer_wood_stock = forms.ModelChoiceField(
+        queryset=DrawerWoodStock.objects.all(),
+        required=False,
+        empty_label="All wood stocks",
+        label="Drawer Wood Stock"
+    )
+    drawer_wood_percent = forms.DecimalField(
+        max_digits=6,
+        decimal_places=2,
+        required=False,
+        label="Drawer Wood Price Change (%)"
+    )
+    drawer_tier_percent = forms.DecimalField(
+        max_digits=6,
+        decimal_places=2,
+        required=False,
+        label="Drawer Height Tier Price Change (%)"
+    )
+    surcharge_width = forms.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        min_value=0,
+        required=False,
+        label="New Surcharge Width (inches)"
+    )
+    surcharge_depth = forms.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        min_value=0,
+        required=False,
+        label="New Surcharge Depth (inches)"
+    )
+    surcharge_percent = forms.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        required=False,
+        label="New Surcharge (%)"
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        for field in ('door_wood_percent', 'drawer_wood_percent', 'drawer_tier_percent'):
+            percent = cleaned_data.get(field)
+            if percent is not None and percent <= -100:
+                self.add_error(field, "A price cannot drop by 100% or more.")
+        if cleaned_data.get('surcharge_percent') and not (
+            cleaned_data.get('surcharge_width') or cleaned_data.get('surcharge_depth')
+        ):
+            self.add_error('surcharge_width', "Enter a width or depth threshold for the new surcharge.")
+        return cleaned_data
+
+    def scenario(self):
+        """Build the PricingScenario described by the cleaned form data."""
+        from decimal import Decimal
+        from ..services.pricing_catalog import DimensionSurcharge
+        from ..services.pricing_simulator import PricingScenario
+
+        data = self.cleaned_data
+        new_surcharge = None
+        if data.get('surcharge_percent'):
+            new_surcharge = DimensionSurcharge(
+                width=data.get('surcharge_width') or Decimal('0.00'),
+                depth=data.get('surcharge_depth') or Decimal('0.00'),
+                surcharge_percent=data['surcharge_percent'],
+            )
+        return PricingScenario(
+            door_wood_stock_id=data['door_wood_stock'].pk if data.get('door_wood_stock') else None,
+            door_panel=data['door_panel'],
+            door_wood_percent=data.get('door_wood_percent') or Decimal('0'),
+            drawer_wood_stock_id=data['drawer_wood_stock'].pk if data.get('drawer_wood_stock') else None,
+            drawer_wood_percent=data.get('drawer_wood_percent') or Decimal('0'),
+            drawer_tier_percent=data.get('drawer_tier_percent') or Decimal('0'),
+            new_surcharge=new_surcharge,
+        )
+
+
+class SizeListField(forms.CharField):
+    """Comma-separated list of sizes in inches, returned sorted and de-duplicated."""
+    max_sizes = 30
+
+    def to_python(self, value):
+        from decimal import Decimal, InvalidOperation
+        value = super().to_python(value)
+        sizes = set()
+        for part in value.replace(',', ' ').split():
+            try:
+                size = Decimal(part)
+            except InvalidOperation:
+                raise forms.ValidationError(f'"{part}" is not a number.')
+            if not size.is_finite() or size <= 0:
+                raise forms.ValidationError("Sizes must be greater than zero.")
+            if size.as_tuple().exponent < -3:
+                raise forms.ValidationError("Sizes can have at most 3 decimal places.")
+            sizes.add(size)
+        if len(sizes) > self.max_sizes:
+            raise forms.ValidationError(f"Enter at most {self.max_sizes} sizes.")
+        return sorted(sizes)
+
+
+class PriceSheetForm(forms.Form):
+    """Size grid and variants for a printable door or drawer price list"""
+    SHEET_CHOICES = [
+        ('doors', 'Doors'),
+        ('drawers', 'Drawers'),
+    ]
+    FORMAT_CHOICES = [
+        ('pdf', 'PDF'),
+        ('csv', 'CSV'),
+    ]
+    MAX_CELLS = 100000
+
+    sheet = forms.ChoiceField(choices=SHEET_CHOICES, initial='doors', label="Price List")
+    format = forms.ChoiceField(choices=FORMAT_CHOICES, initial='pdf', label="Format")
+    widths = SizeListField(
+        initial="12, 15, 18, 21, 24, 27, 30, 33, 36",
+        label="Widths (inches)"
+    )
+    heights = SizeListField(
+        initial="12, 18, 24, 30, 36, 42",
+        label="Heights (inches)"
+    )
+    depths = SizeListField(
+        required=False,
+        initial="18, 21",
+        label="Drawer Depths (inches)"
+    )
+    styles = forms.ModelMultipleChoiceField(
+        queryset=Style.objects.all(),
+        required=False,
+        label="Door Styles (blank for all)"
+    )
+    wood_stocks = forms.ModelMultipleChoiceField(
+        queryset=WoodStock.objects.all(),
+        required=False,
+        label="Door Wood Stocks (blank for all)"
+    )
+    panel_rise = forms.ModelChoiceField(
+        queryset=PanelRise.objects.all(),
+        required=False,
+        empty_label="No panel rise",
+        label="Door Panel Rise"
+    )
+    drawer_wood_stocks = forms.ModelMultipleChoiceField(
+        queryset=DrawerWoodStock.objects.all(),
+        required=False,
+        label="Drawer Wood Stocks (blank for all)"
+    )
+    bottoms = forms.ModelMultipleChoiceField(
+        queryset=DrawerBottomSize.objects.all(),
+        required=False,
+        label="Drawer Bottoms (blank for all)"
+    )
+    undermount = forms.BooleanField(required=False, label="Drawers With Undermount Slides")
+    finishing = forms.BooleanField(required=False, label="Drawers With Finishing")
+
+    def clean(self):
+        cleaned_data = super().clean()
+        widths, heights = cleaned_data.get('widths'), cleaned_data.get('heights')
+        if not widths or not heights:
+            return cleaned_data
+        if cleaned_data.get('sheet') == 'drawers':
+            depths = cleaned_data.get('depths')
+            if not depths:
+                self.add_error('depths', "Enter at least one drawer depth.")
+                return cleaned_data
+            variants = (len(depths)
+                        * self._selected_count('drawer_wood_stocks', DrawerWoodStock)
+                        * self._selected_count('bottoms', DrawerBottomSize))
+        else:
+            variants = self._selected_count('styles', Style) * self._selected_count('wood_stocks', WoodStock)
+        if variants * len(widths) * len(heights) > self.MAX_CELLS:
+            raise forms.ValidationError(
+                f"That is more than {self.MAX_CELLS:,} prices; pick fewer sizes, styles or wood stocks."
+            )
+        return cleaned_data
+
+    def _selected_count(self, field, model):
+        """Number of rows picked in a multiple-choice field; blank means all of them."""
+        selected = self.cleaned_data.get(field)
+        return len(selected) if selected else model.objects.count()
+
+    def price_sheet(self):
+        """Price the sheet described by the cleaned form data."""
+        from ..services.price_sheet import door_price_sheet, drawer_price_sheet
+
+        data = self.cleaned_data
+        if data['sheet'] == 'drawers':
+            return drawer_price_sheet(
+                data['widths'], data['heights'], data['depths'],
+                wood_stock_ids=[wood.pk for wood in data['drawer_wood_stocks']],
+                bottom_ids=[bottom.pk for bottom in data['bottoms']],
+                undermount=data['undermount'],
+                finishing=data['finishing'],
+            )
+        return door_price_sheet(
+            data['widths'], data['heights'],
+            style_ids=[style.pk for style in data['styles']],
+            wood_stock_ids=[wood.pk for wood in data['wood_stocks']],
+            panel_rise_id=data['panel_rise'].pk if data.get('panel_rise') else None,
+        )
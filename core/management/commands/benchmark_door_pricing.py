@@ -0,0 +1,105 @@
+"""
+Management command to benchmark door pricing paths against each other.
+"""
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models.door import WoodStock, Style, PanelRise
+from core.services.pricing_catalog import get_pricing_catalog
+
+
+class Command(BaseCommand):
+    help = 'Times door unit pricing through the ORM, per-call catalog lookups and the (style, wood stock) table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--doors', type=int, default=50000,
+                            help='Number of randomized doors to price with the in-memory paths (default 50000)')
+        parser.add_argument('--orm-doors', type=int, default=500,
+                            help='Number of those doors to also price through the ORM (default 500, 0 to skip)')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Time each path this many times and report the fastest run (default 3)')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed for a reproducible run')
+
+    def handle(self, *args, **options):
+        catalog = get_pricing_catalog()
+        if not catalog.styles or not catalog.wood_stocks:
+            raise CommandError('Door pricing settings must be populated to run the benchmark')
+
+        seed = options['seed'] if options['seed'] is not None else random.randrange(2 ** 32)
+        rng = random.Random(seed)
+        rises = list(catalog.panel_rises) + [None]
+        doors = [
+            (
+                rng.choice(list(catalog.wood_stocks)),
+                rng.choice(list(catalog.styles)),
+                rng.choice(rises),
+                Decimal(rng.randint(3 * 16, 48 * 16)) / 16,
+                Decimal(rng.randint(3 * 16, 96 * 16)) / 16,
+            )
+            for _ in range(max(options['doors'], 1))
+        ]
+        self.stdout.write(f'Seed: {seed}')
+        self.stdout.write(f'Pricing table: {len(catalog.door_rates)} (style, wood stock) pairs')
+
+        expected = [catalog.price_door(*door).unit_price for door in doors]
+        paths = [
+            ('Per-call catalog lookups', lambda door: self.lookup_price(catalog, *door)),
+            ('(style, wood stock) table', lambda door: catalog.door_unit_price(*door)),
+            ('  with full breakdown', lambda door: catalog.price_door(*door).unit_price),
+        ]
+        orm_doors = doors[:max(options['orm_doors'], 0)]
+        if orm_doors:
+            paths.insert(0, ('ORM queries per door', self.orm_price))
+
+        baseline = None
+        for label, price in paths:
+            sample = orm_doors if price == self.orm_price else doors
+            seconds = float('inf')
+            for _ in range(max(options['repeat'], 1)):
+                start = time.perf_counter()
+                prices = [price(door) for door in sample]
+                seconds = min(seconds, time.perf_counter() - start)
+            per_door = seconds / len(sample) * 1e6
+            if prices != expected[:len(sample)]:
+                raise CommandError(f'{label} disagrees with PricingCatalog.price_door')
+            baseline = baseline or per_door
+            self.stdout.write(f'{label:<28} {per_door:10.2f} us/door  {baseline / per_door:8.1f}x')
+
+    @staticmethod
+    def lookup_price(catalog, wood_stock_id, style_id, panel_rise_id, width, height):
+        """Door price with the style and wood stock rates combined on every call."""
+        style = catalog.style(style_id)
+        wood = catalog.wood_stock(wood_stock_id)
+        rise_surcharge = catalog.panel_rise_surcharge(panel_rise_id)
+        material_cost = wood.flat_panel_price if style.use_flat_panel_price else wood.raised_panel_price
+        square_feet = catalog.door_square_feet(style_id, width, height)
+        price = style.design_charge + square_feet * material_cost
+        if style.surcharge_percent and (
+            (style.surcharge_width and width > style.surcharge_width)
+            or (style.surcharge_height and height > style.surcharge_height)
+        ):
+            price *= (1 + style.surcharge_percent / Decimal('100'))
+        return (price + rise_surcharge).quantize(Decimal('0.01'))
+
+    @staticmethod
+    def orm_price(door):
+        """Door price with its settings rows fetched from the database."""
+        wood_stock_id, style_id, panel_rise_id, width, height = door
+        wood = WoodStock.objects.get(pk=wood_stock_id)
+        style = Style.objects.select_related('panel_type', 'design').get(pk=style_id)
+        rise_surcharge = PanelRise.objects.get(pk=panel_rise_id).surcharge if panel_rise_id else Decimal('0.00')
+        panel_type = style.panel_type
+        material_cost = wood.flat_panel_price if panel_type.use_flat_panel_price else wood.raised_panel_price
+        square_feet = (width * height) / Decimal('144')
+        if panel_type.minimum_sq_ft and square_feet < panel_type.minimum_sq_ft:
+            square_feet = panel_type.minimum_sq_ft
+        price = panel_type.design_charge + style.design.price + square_feet * material_cost
+        if panel_type.surcharge_percent and (
+            (panel_type.surcharge_width and width > panel_type.surcharge_width)
+            or (panel_type.surcharge_height and height > panel_type.surcharge_height)
+        ):
+            price *= (1 + panel_type.surcharge_percent / Decimal('100'))
+        return (price + rise_surcharge).quantize(Decimal('0.01'))
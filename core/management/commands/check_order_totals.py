@@ -0,0 +1,61 @@
+"""
+Management command to check stored order line item summaries against a full recount.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.models import Order
+from core.services.order_service import OrderConflictError, OrderService
+
+
+class Command(BaseCommand):
+    help = ('Recounts the line items of every order and quote and reports stored item counts and '
+            'item totals that differ, e.g. after incremental updates')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true',
+                            help='Save the recounted values on the orders that differ; quotes also get '
+                                 'their totals derived again, confirmed orders keep their saved totals')
+        parser.add_argument('--chunk-size', type=int, default=200,
+                            help='Orders loaded with their line items per query (default 200)')
+
+    def handle(self, *args, **options):
+        orders = Order.objects.with_items().order_by('pk').iterator(chunk_size=max(options['chunk_size'], 1))
+        checked = 0
+        drifted = []
+        skipped = 0
+        for order in orders:
+            checked += 1
+            differences = order.check_totals()
+            if not differences:
+                continue
+            details = ', '.join(f'{field} {stored} != {expected}'
+                                for field, (stored, expected) in differences.items())
+            self.stdout.write(self.style.WARNING(f'  {order.order_number}: {details}'))
+            if options['fix']:
+                try:
+                    with transaction.atomic():
+                        OrderService.claim_version(order)
+                        order.refresh_line_item_summary()
+                        # Confirmed orders keep the discount, tax and total they were saved with
+                        if order.is_quote:
+                            order.derive_totals()
+                        order.save()
+                except OrderConflictError:
+                    self.stdout.write(self.style.ERROR(
+                        f'  {order.order_number}: changed while checking, skipped; run again to check it'))
+                    skipped += 1
+                    continue
+                if not order.is_quote:
+                    self.stdout.write(f'  {order.order_number}: totals kept as saved; review them on the order')
+            drifted.append(order)
+
+        self.stdout.write(f'Checked {checked} orders and quotes')
+        if drifted and not options['fix']:
+            raise CommandError(f'{len(drifted)} order(s) differ from a full recount; run with --fix to update them')
+        if skipped:
+            raise CommandError(f'Recounted {len(drifted)} order(s); {skipped} changed while checking and were skipped')
+        if drifted:
+            self.stdout.write(self.style.SUCCESS(f'Recounted {len(drifted)} order(s)'))
+        else:
+            self.stdout.write(self.style.SUCCESS('All stored line item summaries match a full recount'))
@@ -0,0 +1,103 @@
+"""
+Management command to check the fixed-point pricing kernel against line item pricing.
+"""
+import random
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import DoorLineItem, DrawerLineItem
+from core.services.fixed_point import cents_to_decimal, get_fixed_point_kernel
+from core.services.pricing_catalog import get_pricing_catalog
+
+
+class Command(BaseCommand):
+    help = ('Prices randomized doors and drawers over the current pricing settings with the '
+            'fixed-point kernel and with the line items\' calculate_price(), and reports any difference')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--samples', type=int, default=20000,
+                            help='Number of randomized line items to price (default 20000)')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed for a reproducible run')
+
+    def handle(self, *args, **options):
+        seed = options['seed'] if options['seed'] is not None else random.randrange(2 ** 32)
+        rng = random.Random(seed)
+        self.stdout.write(f'Seed: {seed}')
+
+        catalog = get_pricing_catalog()
+        if not catalog.styles or not catalog.wood_stocks or not catalog.drawer_wood_stocks \
+                or not catalog.drawer_bottoms:
+            raise CommandError('Door and drawer pricing settings must be populated to check pricing parity')
+        kernel = get_fixed_point_kernel(catalog)
+
+        samples = max(options['samples'], 2)
+        doors = [self.random_door(rng, catalog) for _ in range(samples // 2)]
+        drawers = [self.random_drawer(rng, catalog) for _ in range(samples - len(doors))]
+
+        expected = [item.calculate_price() for item in doors + drawers]
+        actual = [kernel.door_cents(item.wood_stock_id, item.style_id, item.panel_rise_id,
+                                    item.width, item.height) for item in doors]
+        actual += [kernel.drawer_cents(item.wood_stock_id, item.bottom_id, item.width, item.height,
+                                       item.depth, item.undermount, item.finishing) for item in drawers]
+        actual = [None if cents is None else cents_to_decimal(cents) for cents in actual]
+
+        checked = fallbacks = 0
+        mismatches = []
+        for item, want, got in zip(doors + drawers, expected, actual):
+            checked += 1
+            if got is None:
+                fallbacks += 1
+            elif got != want or got.as_tuple().exponent != want.as_tuple().exponent:
+                mismatches.append((item, want, got))
+
+        self.stdout.write(f'Priced {checked} line items')
+        self.stdout.write(f'Not priced by the kernel (half-cent ties): {fallbacks}')
+
+        if mismatches:
+            for item, want, got in mismatches[:10]:
+                self.stdout.write(self.style.ERROR(
+                    f'  {self.describe(item)}: calculate_price {want}, fixed-point {got}'))
+            raise CommandError(f'{len(mismatches)} price(s) differ between the kernel and calculate_price()')
+        self.stdout.write(self.style.SUCCESS('All fixed-point prices match calculate_price()'))
+
+    @staticmethod
+    def inches(rng, low, high, places):
+        value = Decimal(rng.randint(low * 10 ** places, high * 10 ** places)).scaleb(-places)
+        # Shop dimensions are usually sixteenths; mix those in to hit exact ties.
+        if rng.random() < 0.5:
+            value = Decimal(rng.randint(low * 16, high * 16)) / 16
+        return value.quantize(Decimal(1).scaleb(-places))
+
+    def random_door(self, rng, catalog):
+        """An unsaved door line item over the saved settings rows."""
+        return DoorLineItem(
+            type='door',
+            wood_stock_id=rng.choice(list(catalog.wood_stocks)),
+            style_id=rng.choice(list(catalog.styles)),
+            panel_rise_id=rng.choice(list(catalog.panel_rises) + [None]),
+            width=self.inches(rng, 3, 48, 3),
+            height=self.inches(rng, 3, 96, 3),
+        )
+
+    def random_drawer(self, rng, catalog):
+        """An unsaved drawer line item over the saved settings rows."""
+        return DrawerLineItem(
+            type='drawer',
+            wood_stock_id=rng.choice(list(catalog.drawer_wood_stocks)),
+            bottom_id=rng.choice(list(catalog.drawer_bottoms)),
+            width=self.inches(rng, 4, 42, 3),
+            height=self.inches(rng, 2, 16, 3),
+            depth=self.inches(rng, 8, 30, 3),
+            undermount=rng.random() < 0.5,
+            finishing=rng.random() < 0.5,
+        )
+
+    @staticmethod
+    def describe(item):
+        if item.type == 'door':
+            return (f'door wood_stock={item.wood_stock_id} style={item.style_id} '
+                    f'panel_rise={item.panel_rise_id} {item.width} x {item.height}')
+        return (f'drawer wood_stock={item.wood_stock_id} bottom={item.bottom_id} '
+                f'{item.width} x {item.height} x {item.depth} undermount={item.undermount} '
+                f'finishing={item.finishing}')
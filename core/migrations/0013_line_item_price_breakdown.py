@@ -0,0 +1,48 @@
+# Generated by Django 5.1.7 on 2026-10-17 03:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_increase_dimension_decimal_places'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='doorlineitem',
+            name='design_charge',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Panel type and design charge', max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='doorlineitem',
+            name='material_cost',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Material cost per square foot', max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='doorlineitem',
+            name='oversize_percent',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Oversize surcharge percentage applied', max_digits=5, null=True),
+        ),
+        migrations.AddField(
+            model_name='doorlineitem',
+            name='priced_square_feet',
+            field=models.DecimalField(blank=True, decimal_places=4, help_text='Square footage the door was priced at, after the panel type minimum', max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='doorlineitem',
+            name='rise_surcharge',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Panel rise surcharge applied', max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='drawerlineitem',
+            name='surcharge_percent',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Dimension surcharge percentage applied', max_digits=5, null=True),
+        ),
+        migrations.AddField(
+            model_name='drawerlineitem',
+            name='tier_price',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Base price of the height tier', max_digits=10, null=True),
+        ),
+    ]
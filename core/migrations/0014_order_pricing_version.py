@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-17 03:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_line_item_price_breakdown'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='pricing_version',
+            field=models.CharField(blank=True, default='', help_text='Pricing catalog version the line items were priced with', max_length=40, verbose_name='Pricing Version'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.1.7 on 2026-10-17 04:02
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+
+
+def fill_line_item_summary(apps, schema_editor):
+    """Count and total the line items of existing orders"""
+    Order = apps.get_model('core', 'Order')
+    tables = {
+        'door_count': apps.get_model('core', 'DoorLineItem'),
+        'drawer_count': apps.get_model('core', 'DrawerLineItem'),
+        'misc_count': apps.get_model('core', 'GenericLineItem'),
+    }
+    summaries = {}
+    for field, model in tables.items():
+        rows = (model.objects.order_by().values('order')
+                .annotate(count=Count('pk'), total=Sum(F('price_per_unit') * F('quantity'))))
+        for row in rows:
+            summary = summaries.setdefault(row['order'], {'item_total': Decimal('0.00')})
+            summary[field] = row['count']
+            summary['item_total'] += Decimal(str(row['total'] or 0))
+
+    orders = list(Order.objects.filter(pk__in=summaries))
+    for order in orders:
+        summary = summaries[order.pk]
+        for field in tables:
+            setattr(order, field, summary.get(field, 0))
+        order.item_total = summary['item_total'].quantize(Decimal('0.01'))
+    Order.objects.bulk_update(orders, [*tables, 'item_total'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_order_pricing_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='door_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Door Count'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='drawer_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Drawer Count'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='item_total',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Sum of the line item totals', max_digits=10, verbose_name='Item Total'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='misc_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Miscellaneous Item Count'),
+        ),
+        migrations.RunPython(fill_line_item_summary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-17 04:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_order_line_item_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='version',
+            field=models.PositiveIntegerField(default=1, help_text='Incremented by every save through OrderService; edits made against an older version are rejected', verbose_name='Version'),
+        ),
+    ]
@@ -139,8 +139,8 @@ class Customer(BaseModel):
         defaults = self.door_defaults.copy()
         
         # Get global rail defaults to filter out matching values
-        from .door import RailDefaults
-        global_rail_defaults = RailDefaults.objects.first()
+        from ..services.settings_registry import get_rail_defaults
+        global_rail_defaults = get_rail_defaults()
         
         if global_rail_defaults:
             # Check each rail dimension and remove it if it matches the global default
@@ -165,7 +165,48 @@ class DoorLineItem(LineItem):
         default=False,
         help_text="Whether to sand across the grain"
     )
+
+    # Price breakdown stored at save time (empty for custom-priced items)
+    priced_square_feet = models.DecimalField(
+        max_digits=10,
+        decimal_places=4,
+        null=True,
+        blank=True,
+        help_text="Square footage the door was priced at, after the panel type minimum"
+    )
+    material_cost = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        help_text="Material cost per square foot"
+    )
+    design_charge = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        help_text="Panel type and design charge"
+    )
+    oversize_percent = models.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        help_text="Oversize surcharge percentage applied"
+    )
+    rise_surcharge = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        help_text="Panel rise surcharge applied"
+    )
     
+    BREAKDOWN_FIELDS = (
+        'priced_square_feet', 'material_cost', 'design_charge', 'oversize_percent', 'rise_surcharge',
+    )
+
     class Meta:
         verbose_name = "Door Item"
         verbose_name_plural = "Door Items"
@@ -173,45 +214,38 @@ class DoorLineItem(LineItem):
     @property
     def square_feet(self):
         """Calculate the square footage of the door, enforcing minimum from panel type."""
-        sq_ft = (self.width * self.height) / Decimal('144')
-        min_sq_ft = self.style.panel_type.minimum_sq_ft
-        if min_sq_ft and sq_ft < min_sq_ft:
-            sq_ft = min_sq_ft
-        return sq_ft
+        from ..services.pricing_catalog import get_catalog_for_door
+        catalog = get_catalog_for_door(self.wood_stock_id, self.style_id, self.panel_rise_id)
+        return catalog.door_square_feet(self.style_id, self.width, self.height)
 
-    def calculate_price(self):
-        """Calculate the unit price based on door specifications.
+    def calculate_breakdown(self):
+        """Price the door and return its DoorPriceBreakdown.
 
         Formula: Design Charge + (Square Feet x Material Cost per sq ft)
                  + oversize surcharge (if applicable)
                  + panel rise surcharge (if applicable)
-        """
-        panel_type = self.style.panel_type
 
-        # Material cost per sq ft from wood stock
-        if panel_type.use_flat_panel_price:
-            material_cost = self.wood_stock.flat_panel_price
-        else:
-            material_cost = self.wood_stock.raised_panel_price
-
-        # Design charge from panel type + design
-        design_charge = panel_type.design_charge + self.style.design.price
-
-        # Base price = design charge + (sq ft x material cost)
-        price = design_charge + (self.square_feet * material_cost)
-
-        # Oversize surcharge: if width or height exceeds threshold, apply percentage
-        if panel_type.surcharge_percent and (
-            (panel_type.surcharge_width and self.width > panel_type.surcharge_width)
-            or (panel_type.surcharge_height and self.height > panel_type.surcharge_height)
-        ):
-            price *= (1 + panel_type.surcharge_percent / Decimal('100'))
-
-        # Panel rise surcharge
-        if self.panel_rise and self.panel_rise.surcharge:
-            price += self.panel_rise.surcharge
+        Rates come from the in-memory pricing catalog, so no queries are
+        issued once the catalog is loaded.
+        """
+        from ..services.pricing_catalog import get_catalog_for_door
+        catalog = get_catalog_for_door(self.wood_stock_id, self.style_id, self.panel_rise_id)
+        return catalog.price_door(
+            self.wood_stock_id, self.style_id, self.panel_rise_id,
+            self.width, self.height,
+        )
 
-        return price.quantize(Decimal('0.01'))
+    def calculate_price(self):
+        """Calculate the unit price based on door specifications."""
+        return self.calculate_breakdown().unit_price
+
+    def apply_breakdown(self, breakdown):
+        """Store the square feet, rates and surcharges the door was priced with."""
+        self.priced_square_feet = breakdown.square_feet if breakdown else None
+        self.material_cost = breakdown.material_cost if breakdown else None
+        self.design_charge = breakdown.design_charge if breakdown else None
+        self.oversize_percent = breakdown.oversize_percent if breakdown else None
+        self.rise_surcharge = breakdown.rise_surcharge if breakdown else None
     
     def __str__(self):
         return f"Door {self.id} - {self.wood_stock.name} {self.style.name}"
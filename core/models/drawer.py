@@ -152,7 +152,25 @@ class DrawerLineItem(LineItem):
         default=False,
         help_text="Whether drawer requires finishing"
     )
+
+    # Price breakdown stored at save time (empty for custom-priced items)
+    tier_price = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        help_text="Base price of the height tier"
+    )
+    surcharge_percent = models.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        help_text="Dimension surcharge percentage applied"
+    )
     
+    BREAKDOWN_FIELDS = ('tier_price', 'surcharge_percent')
+
     class Meta:
         verbose_name = 'Drawer'
         verbose_name_plural = 'Drawers'
@@ -160,39 +178,30 @@ class DrawerLineItem(LineItem):
     def __str__(self):
         return f"{self.width}″ × {self.height}″ × {self.depth}″ Drawer"
     
-    def calculate_price(self):
-        """Calculate the unit price of the drawer based on dimensions and options.
+    def calculate_breakdown(self):
+        """Price the drawer and return its DrawerPriceBreakdown.
 
         Formula: DrawerPricing tier base (by height)
                  + WoodStock price + Bottom price
                  + Undermount charge (if selected) + Finish charge (if selected)
                  then x (1 + highest matching surcharge_percent/100) if oversized
         """
-        tier = DrawerPricing.objects.filter(
-            height__gte=self.height
-        ).order_by('height').first()
-        if tier is None:
-            tier = DrawerPricing.objects.order_by('-height').first()
-        tier_price = tier.price if tier else Decimal('0.00')
-
-        price = tier_price + self.wood_stock.price + self.bottom.price
-
-        default_settings = DefaultDrawerSettings.objects.first()
-        if default_settings:
-            if self.undermount:
-                price += default_settings.undermount_charge
-            if self.finishing:
-                price += default_settings.finish_charge
-
-        from django.db.models import Q
-        matching = DrawerDimensionSurcharge.objects.filter(
-            Q(width__gt=0, width__lte=self.width) | Q(depth__gt=0, depth__lte=self.depth)
-        ).order_by('-surcharge_percent').first()
-
-        if matching:
-            price *= (1 + matching.surcharge_percent / Decimal('100'))
-
-        return price.quantize(Decimal('0.01'))
+        from ..services.pricing_catalog import get_catalog_for_drawer
+        catalog = get_catalog_for_drawer(self.wood_stock_id, self.bottom_id)
+        return catalog.price_drawer(
+            self.wood_stock_id, self.bottom_id,
+            self.width, self.height, self.depth,
+            undermount=self.undermount, finishing=self.finishing,
+        )
+
+    def calculate_price(self):
+        """Calculate the unit price of the drawer based on dimensions and options."""
+        return self.calculate_breakdown().unit_price
+
+    def apply_breakdown(self, breakdown):
+        """Store the height tier price and oversize surcharge the drawer was priced with."""
+        self.tier_price = breakdown.tier_price if breakdown else None
+        self.surcharge_percent = breakdown.surcharge_percent if breakdown else None
     
     def save(self, *args, **kwargs):
         # Always set type to 'drawer'
@@ -39,6 +39,15 @@ class LineItem(BaseModel):
         verbose_name="Quantity"
     )
 
+    # Unit price (and, when available, the full breakdown) attached by OrderService
+    # from a price_line_items() batch (see _process_line_items and reprice_order) so
+    # that rendering and saving a priced batch does not reprice each item again.
+    _batch_unit_price = None
+    _batch_breakdown = None
+
+    # Names of the price breakdown columns written by apply_breakdown()
+    BREAKDOWN_FIELDS = ()
+
     class Meta:
         abstract = True
         verbose_name = "Line Item"
@@ -55,16 +64,37 @@ class LineItem(BaseModel):
         This should return the calculated price per unit only, ignoring any custom_price settings.
         """
         raise NotImplementedError("Subclasses must implement calculate_price()")
+
+    def calculate_breakdown(self):
+        """
+        Return the priced components of this item, or None for item types
+        without a pricing formula. Subclasses with stored breakdown columns
+        override this together with apply_breakdown().
+        """
+        return None
+
+    def apply_breakdown(self, breakdown):
+        """
+        Copy a price breakdown onto this item's breakdown columns.
+        A breakdown of None (custom prices) clears them.
+        """
+        pass
     
     @property
     def price(self):
         """
         Returns the total price of the item including quantity.
         If custom_price is True, uses the stored price_per_unit value.
-        Otherwise, calls calculate_price() to get the calculated price per unit.
+        Otherwise, uses the batch-calculated unit price if one was attached.
+        Saved items use their stored (frozen) price_per_unit; only unsaved
+        items call calculate_price().
         """
         if self.custom_price:
             unit_price = self.price_per_unit
+        elif self._batch_unit_price is not None:
+            unit_price = self._batch_unit_price
+        elif not self._state.adding:
+            unit_price = self.price_per_unit
         else:
             unit_price = self.calculate_price()
             
@@ -75,15 +105,36 @@ class LineItem(BaseModel):
         """Calculate the total price for this line item"""
         return self.price
     
-    def save(self, *args, **kwargs):
+    def apply_pricing(self):
         """
-        Override the save method to calculate and set the price_per_unit
-        if custom_price is False. This ensures correct pricing regardless
-        of how the model is instantiated.
+        Set price_per_unit and the breakdown columns from the batch pricing
+        result if one was attached, otherwise by pricing the item now.
+        Custom-priced items keep their price and have no breakdown.
         """
+        breakdown = None
         if not self.custom_price:
-            # Calculate and set the price_per_unit before saving
-            self.price_per_unit = self.calculate_price()
+            if self._batch_unit_price is not None:
+                self.price_per_unit = self._batch_unit_price
+                breakdown = self._batch_breakdown
+            else:
+                breakdown = self.calculate_breakdown()
+                if breakdown is not None:
+                    self.price_per_unit = breakdown.unit_price
+                else:
+                    self.price_per_unit = self.calculate_price()
+        self.apply_breakdown(breakdown)
+
+    def save(self, *args, reprice=None, **kwargs):
+        """
+        Override the save method to calculate and set the price_per_unit
+        if custom_price is False. New items are always priced; saved items
+        keep their stored price unless reprice=True, so later pricing
+        changes do not silently alter existing orders.
+        """
+        if reprice is None:
+            reprice = self._state.adding
+        if reprice:
+            self.apply_pricing()
         
         super().save(*args, **kwargs)
 
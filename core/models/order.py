@@ -1,13 +1,82 @@
 from decimal import Decimal
 from django.db import models
+from django.db.models import Count, F, OuterRef, Prefetch, Subquery, Sum, Value, prefetch_related_objects
+from django.db.models.functions import Coalesce
 from itertools import chain
 from .base import BaseModel
 
-class QuoteManager(models.Manager):
+# Related names of the three line item tables, with the Order field counting each
+LINE_ITEM_RELATIONS = ('door_items', 'drawer_items', 'generic_items')
+LINE_ITEM_COUNT_FIELDS = {
+    'door_items': 'door_count',
+    'drawer_items': 'drawer_count',
+    'generic_items': 'misc_count',
+}
+# Amounts calculate_totals() derives from item_total and the customer defaults
+DERIVED_TOTAL_FIELDS = ('discount_amount', 'surcharge_amount', 'shipping_amount', 'tax_amount', 'total')
+
+
+def _line_item_subquery(relation, aggregate, output_field):
+    """Correlated subquery aggregating the outer order's rows of one line item table."""
+    model = Order._meta.get_field(relation).related_model
+    rows = (
+        model.objects.filter(order=OuterRef('pk')).order_by().values('order')
+        .annotate(value=aggregate).values('value')
+    )
+    return Coalesce(Subquery(rows, output_field=output_field), Value(0), output_field=output_field)
+
+
+def item_total_expression():
+    """
+    SQL expression for an order's item total: SUM(price_per_unit * quantity)
+    over its door, drawer and generic line items, as correlated subqueries
+    on the outer order's pk. Saved line items carry frozen two-place prices,
+    so this equals the sum of their total_price.
+    """
+    money = models.DecimalField(max_digits=12, decimal_places=2)
+    total = Value(Decimal('0.00'), output_field=money)
+    for relation in LINE_ITEM_RELATIONS:
+        total = total + _line_item_subquery(
+            relation, Sum(F('price_per_unit') * F('quantity'), output_field=money), money)
+    return models.ExpressionWrapper(total, output_field=money)
+
+
+def line_item_count_expressions():
+    """{count field: SQL expression counting the outer order's rows of that table}"""
+    return {
+        field: _line_item_subquery(relation, Count('pk'), models.IntegerField())
+        for relation, field in LINE_ITEM_COUNT_FIELDS.items()
+    }
+
+
+def line_item_prefetches():
+    """Prefetches for every line item of an order with the rows it is rendered with."""
+    from .door import DoorLineItem
+    from .drawer import DrawerLineItem
+    return [
+        Prefetch('door_items', queryset=DoorLineItem.objects.select_related(
+            'wood_stock', 'edge_profile', 'panel_rise', 'style__panel_type', 'style__design'
+        )),
+        Prefetch('drawer_items', queryset=DrawerLineItem.objects.select_related('wood_stock', 'bottom')),
+        'generic_items',
+    ]
+
+
+class OrderQuerySet(models.QuerySet):
+    def with_items(self):
+        """
+        Prefetch every line item with the rows it is rendered with, plus the
+        customer and customer defaults, so rendering, serializing or totalling
+        an order takes the same number of queries however many lines it has.
+        """
+        return self.select_related('customer__defaults').prefetch_related(*line_item_prefetches())
+
+
+class QuoteManager(models.Manager.from_queryset(OrderQuerySet)):
     def get_queryset(self):
         return super().get_queryset().filter(is_quote=True)
 
-class ConfirmedManager(models.Manager):
+class ConfirmedManager(models.Manager.from_queryset(OrderQuerySet)):
     def get_queryset(self):
         return super().get_queryset().filter(is_quote=False)
 
@@ -68,9 +137,43 @@ class Order(BaseModel):
         default=0,
         verbose_name="Total"
     )
+    pricing_version = models.CharField(
+        max_length=40,
+        blank=True,
+        default='',
+        verbose_name="Pricing Version",
+        help_text="Pricing catalog version the line items were priced with"
+    )
+    version = models.PositiveIntegerField(
+        default=1,
+        verbose_name="Version",
+        help_text="Incremented by every save through OrderService; edits made against an older version are rejected"
+    )
+
+    # Line item summary, kept in step with the line items by OrderService
+    # (see refresh_line_item_summary) so lists can show it without queries
+    door_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Door Count"
+    )
+    drawer_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Drawer Count"
+    )
+    misc_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Miscellaneous Item Count"
+    )
+    item_total = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        default=0,
+        verbose_name="Item Total",
+        help_text="Sum of the line item totals"
+    )
 
     # Managers
-    objects = models.Manager()
+    objects = OrderQuerySet.as_manager()
     quotes = QuoteManager()
     confirmed = ConfirmedManager()
 
@@ -113,24 +216,69 @@ class Order(BaseModel):
     
     def count_total_items(self):
         """Count all line items"""
-        return self.door_items.count() + self.drawer_items.count() + self.generic_items.count()
+        return self.door_count + self.drawer_count + self.misc_count
             
     def get_item_types_summary(self):
         """Get a summary of item types and counts"""
         return {
-            'doors': self.door_items.count(),
-            'drawers': self.drawer_items.count(),
-            'misc': self.generic_items.count(),
+            'doors': self.door_count,
+            'drawers': self.drawer_count,
+            'misc': self.misc_count,
             'total': self.count_total_items()
         }
 
+    def line_item_summary(self):
+        """
+        Count and total this order's line items from the database, in one
+        aggregate query. Unsaved orders and orders whose line items were
+        prefetched are summed in Python instead.
+
+        Returns:
+            dict: door_count, drawer_count, misc_count and item_total
+        """
+        prefetched = getattr(self, '_prefetched_objects_cache', {})
+        if self.pk is None or all(relation in prefetched for relation in LINE_ITEM_RELATIONS):
+            return self._python_line_item_summary()
+        expressions = {'item_total': item_total_expression(), **line_item_count_expressions()}
+        # Annotations cannot reuse the names of the stored fields
+        row = (Order.objects.filter(pk=self.pk)
+               .annotate(**{f'live_{field}': expression for field, expression in expressions.items()})
+               .values(*(f'live_{field}' for field in expressions)).first())
+        if row is None:
+            return self._python_line_item_summary()
+        summary = {field: row[f'live_{field}'] for field in expressions}
+        summary['item_total'] = summary['item_total'].quantize(Decimal('0.01'))
+        return summary
+
+    def _python_line_item_summary(self):
+        """line_item_summary() computed from each line item's total_price."""
+        summary = {'item_total': Decimal('0.00')}
+        for relation, field in LINE_ITEM_COUNT_FIELDS.items():
+            items = list(getattr(self, relation).all()) if self.pk is not None else []
+            summary[field] = len(items)
+            summary['item_total'] += sum((item.total_price for item in items), Decimal('0.00'))
+        return summary
+
+    def prefetch_line_items(self):
+        """Load the with_items() prefetch onto this instance, unless it already has it."""
+        prefetch_related_objects([self], *line_item_prefetches())
+
+    def clear_line_item_cache(self):
+        """Forget line items prefetched by with_items(), after writing to their tables."""
+        cache = getattr(self, '_prefetched_objects_cache', {})
+        for relation in LINE_ITEM_RELATIONS:
+            cache.pop(relation, None)
+
+    def refresh_line_item_summary(self):
+        """Set door_count, drawer_count, misc_count and item_total from the line items."""
+        for field, value in self.line_item_summary().items():
+            setattr(self, field, value)
+
     @property
-    def item_total(self):
-        """Calculate the sum of all line items"""
-        door_total = sum(item.total_price for item in self.door_items.all())
-        drawer_total = sum(item.total_price for item in self.drawer_items.all())
-        generic_total = sum(item.total_price for item in self.generic_items.all())
-        return door_total + drawer_total + generic_total
+    def pricing_outdated(self):
+        """Whether pricing settings changed since this order's line items were priced"""
+        from ..services.pricing_catalog import get_pricing_catalog
+        return self.pricing_version != get_pricing_catalog().version
 
     @property
     def subtotal(self):
@@ -138,7 +286,50 @@ class Order(BaseModel):
         return self.item_total - self.discount_amount + self.surcharge_amount + self.shipping_amount
 
     def calculate_totals(self):
-        """Calculate and update all order totals based on customer defaults"""
+        """
+        Refresh the line item summary and calculate and update all order
+        totals based on customer defaults
+        """
+        self.refresh_line_item_summary()
+        self.derive_totals()
+
+    def apply_line_item_changes(self, added=(), removed=()):
+        """
+        Adjust the stored line item summary for saved line items added to or
+        removed from this order (an edited line is removed, then added) and
+        derive the totals from it again. Only the changed lines are read, so
+        the cost does not grow with the size of the order; check_totals()
+        compares the summary with a full recount.
+        """
+        for items, sign in ((added, 1), (removed, -1)):
+            for item in items:
+                field = LINE_ITEM_COUNT_FIELDS[item._meta.get_field('order').remote_field.related_name]
+                setattr(self, field, getattr(self, field) + sign)
+                self.item_total = (self.item_total + sign * item.total_price).quantize(Decimal('0.01'))
+        self.derive_totals()
+
+    def check_totals(self):
+        """
+        Compare the stored line item summary, which saves adjust by the
+        changed lines only, with a full recount of the line items. The
+        discount, surcharge, shipping, tax and total are left out: they follow
+        the customer's defaults as of the last save, and those may have
+        changed since.
+
+        Returns:
+            dict: {field: (stored, recalculated)} for every field that differs
+        """
+        return {
+            field: (getattr(self, field), value)
+            for field, value in self.line_item_summary().items()
+            if getattr(self, field) != value
+        }
+
+    def derive_totals(self):
+        """
+        Calculate discount, surcharge, shipping, tax and total from the
+        stored item_total and the customer defaults
+        """
         TWO_PLACES = Decimal('0.01')
         customer_defaults = self.customer.defaults
         item_total = self.item_total
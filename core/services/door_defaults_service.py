@@ -2,8 +2,9 @@ from decimal import Decimal, InvalidOperation
 from typing import Dict, Any, Optional, Union
 from django.core.exceptions import ObjectDoesNotExist
 
-from ..models.door import WoodStock, EdgeProfile, PanelRise, Style, RailDefaults
+from ..models.door import WoodStock, EdgeProfile, PanelRise, Style
 from ..models.customer import Customer
+from .settings_registry import get_rail_defaults
 
 class DoorDefaultsService:
     """Service class to handle all door defaults logic."""
@@ -22,7 +23,7 @@ class DoorDefaultsService:
 
     def _get_global_defaults(self) -> Dict[str, Decimal]:
         """Get global rail defaults."""
-        defaults = RailDefaults.objects.first()
+        defaults = get_rail_defaults()
         if not defaults:
             return {
                 'rail_top': Decimal('2.500'),
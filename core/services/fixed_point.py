@@ -0,0 +1,315 @@
+"""
+Integer fixed-point pricing kernel.
+
+Dimensions are carried in thousandths of an inch, money in hundredths of a
+cent and percentages in hundredths of a percent, so a door or drawer price
+is an exact rational numerator/denominator pair of Python ints. The result
+is rounded to cents half-even, exactly like ``Decimal.quantize`` in
+PricingCatalog.price_door / price_drawer. Line items are always priced with
+the Decimal path; the kernel backs the /pricing/table/ data the door and
+drawer forms preview prices from.
+
+The Decimal door path divides by 144, which does not terminate unless the
+area is a multiple of 9, so its 28-digit context rounds the square footage.
+That error is far below a cent and only matters when the exact price lands
+on a half cent; in that case the kernel returns None and the caller falls
+back to the Decimal path. It also returns None for inputs that are off the
+fixed-point grid (more decimal places than the model fields allow) or rows
+missing from the catalog. ``manage.py check_pricing_parity`` compares the
+kernel with line item calculate_price() over randomized inputs.
+"""
+import bisect
+import threading
+from dataclasses import dataclass
+from decimal import Decimal
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
+
+from .pricing_catalog import PricingCatalog, SurchargeIndex, highest_surcharge
+
+INCH = 1000          # thousandths of an inch
+DOLLAR = 10000       # hundredths of a cent
+PERCENT = 100        # hundredths of a percent
+SQ_FT = 100          # hundredths of a square foot (PanelType.minimum_sq_ft)
+
+# Square inches (in thousandths squared) per square foot.
+_SQ_FT_AREA = 144 * INCH * INCH
+
+
+def to_fixed(value, scale: int) -> Optional[int]:
+    """Return ``value * scale`` as an int, or None if it is not a whole number."""
+    if value is None:
+        return None
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value))
+    scaled = value * scale
+    whole = int(scaled)
+    if whole != scaled:
+        return None
+    return whole
+
+
+def round_cents(numerator: int, denominator: int, exact: bool = True) -> Optional[int]:
+    """Round ``numerator / denominator`` dollars-in-DOLLAR-units to whole cents, half-even.
+
+    Returns None on a half-cent tie when ``exact`` is False, because the
+    Decimal path may have landed a hair to either side of it.
+    """
+    unit = denominator * (DOLLAR // 100)
+    cents, remainder = divmod(numerator, unit)
+    twice = remainder * 2
+    if twice > unit:
+        cents += 1
+    elif twice == unit:
+        if not exact:
+            return None
+        if cents % 2:
+            cents += 1
+    return cents
+
+
+def cents_to_decimal(cents: int) -> Decimal:
+    """Whole cents as a two-place Decimal, matching ``quantize(Decimal('0.01'))``."""
+    return Decimal(cents).scaleb(-2)
+
+
+@dataclass(frozen=True)
+class FixedStyle:
+    design_charge: int
+    minimum_sq_ft: int
+    surcharge_width: int
+    surcharge_height: int
+    surcharge_percent: int
+    use_flat_panel_price: bool
+
+
+@dataclass(frozen=True)
+class FixedPointKernel:
+    """Integer copy of a PricingCatalog.
+
+    Rows whose rates are off the grid are left out, so lookups for them miss
+    and fall back. The drawer tiers, dimension surcharges and option charges
+    apply to every drawer; if any of them is off the grid ``drawer_tables``
+    is False and every drawer falls back.
+    """
+    version: str
+    wood_stocks: Mapping[int, Tuple[int, int]]
+    styles: Mapping[int, FixedStyle]
+    panel_rises: Mapping[int, int]
+    drawer_wood_stocks: Mapping[int, int]
+    drawer_bottoms: Mapping[int, int]
+    drawer_tiers: Tuple[Tuple[int, int], ...]
+    dimension_surcharges: Tuple[Tuple[int, int, int], ...]
+    undermount_charge: int
+    finish_charge: int
+    drawer_tables: bool
+    # (style_id, wood_stock_id) -> (design_charge, material, minimum_sq_ft,
+    # surcharge_width, surcharge_height, surcharge_percent), as in PricingCatalog.door_rates
+    door_rates: Mapping[Tuple[int, int], Tuple[int, int, int, int, int, int]]
+    # Heights of drawer_tiers, for bisecting
+    drawer_tier_heights: Tuple[int, ...]
+    # dimension_surcharges indexed by width and by depth threshold
+    surcharges_by_width: SurchargeIndex
+    surcharges_by_depth: SurchargeIndex
+
+    @classmethod
+    def from_catalog(cls, catalog: PricingCatalog) -> 'FixedPointKernel':
+        drawer_tables = True
+
+        def fixed_map(source, convert):
+            result = {}
+            for pk, value in source.items():
+                converted = convert(value)
+                if converted is not None:
+                    result[pk] = converted
+            return MappingProxyType(result)
+
+        def wood(rates):
+            raised = to_fixed(rates.raised_panel_price, DOLLAR)
+            flat = to_fixed(rates.flat_panel_price, DOLLAR)
+            return None if raised is None or flat is None else (raised, flat)
+
+        def style(rates):
+            values = (
+                to_fixed(rates.design_charge, DOLLAR),
+                to_fixed(rates.minimum_sq_ft, SQ_FT),
+                to_fixed(rates.surcharge_width, INCH),
+                to_fixed(rates.surcharge_height, INCH),
+                to_fixed(rates.surcharge_percent, PERCENT),
+            )
+            if None in values:
+                return None
+            return FixedStyle(*values, use_flat_panel_price=rates.use_flat_panel_price)
+
+        def money(value):
+            return to_fixed(value, DOLLAR)
+
+        def fixed_tuple(rows):
+            nonlocal drawer_tables
+            if None in (value for row in rows for value in row):
+                drawer_tables = False
+                return ()
+            return tuple(rows)
+
+        drawer_tiers = fixed_tuple([
+            (to_fixed(tier.height, INCH), to_fixed(tier.price, DOLLAR))
+            for tier in catalog.drawer_tiers
+        ])
+        dimension_surcharges = fixed_tuple([
+            (to_fixed(row.width, INCH), to_fixed(row.depth, INCH), to_fixed(row.surcharge_percent, PERCENT))
+            for row in catalog.dimension_surcharges
+        ])
+        options = catalog.drawer_options
+        undermount_charge = to_fixed(options.undermount_charge, DOLLAR) if options else 0
+        finish_charge = to_fixed(options.finish_charge, DOLLAR) if options else 0
+        if undermount_charge is None or finish_charge is None:
+            drawer_tables = False
+
+        wood_stocks = fixed_map(catalog.wood_stocks, wood)
+        styles = fixed_map(catalog.styles, style)
+        door_rates = {
+            (style_id, wood_id): (
+                rates.design_charge,
+                flat if rates.use_flat_panel_price else raised,
+                rates.minimum_sq_ft,
+                rates.surcharge_width,
+                rates.surcharge_height,
+                rates.surcharge_percent,
+            )
+            for style_id, rates in styles.items()
+            for wood_id, (raised, flat) in wood_stocks.items()
+        }
+
+        return cls(
+            version=catalog.version,
+            wood_stocks=wood_stocks,
+            styles=styles,
+            panel_rises=fixed_map(catalog.panel_rises, money),
+            drawer_wood_stocks=fixed_map(catalog.drawer_wood_stocks, money),
+            drawer_bottoms=fixed_map(catalog.drawer_bottoms, money),
+            drawer_tiers=drawer_tiers,
+            dimension_surcharges=dimension_surcharges,
+            undermount_charge=undermount_charge,
+            finish_charge=finish_charge,
+            drawer_tables=drawer_tables,
+            door_rates=MappingProxyType(door_rates),
+            drawer_tier_heights=tuple(tier_height for tier_height, _ in drawer_tiers),
+            surcharges_by_width=SurchargeIndex.build((row[0], row[2]) for row in dimension_surcharges),
+            surcharges_by_depth=SurchargeIndex.build((row[1], row[2]) for row in dimension_surcharges),
+        )
+
+    def door_cents(self, wood_stock_id, style_id, panel_rise_id, width, height) -> Optional[int]:
+        """Door unit price in cents, or None if the Decimal path must be used.
+
+        ``width`` and ``height`` are Decimal inches.
+        """
+        try:
+            (design_charge, material, minimum_sq_ft,
+             surcharge_width, surcharge_height, surcharge_percent) = self.door_rates[int(style_id), int(wood_stock_id)]
+            rise = self.panel_rises[int(panel_rise_id)] if panel_rise_id is not None else 0
+        except (KeyError, TypeError, ValueError):
+            return None
+        # Inlined to_fixed(); this is the hot path of bulk repricing.
+        scaled_width, scaled_height = width * INCH, height * INCH
+        width, height = int(scaled_width), int(scaled_height)
+        if width != scaled_width or height != scaled_height:
+            return None
+
+        area = width * height
+        if minimum_sq_ft and area * SQ_FT < minimum_sq_ft * _SQ_FT_AREA:
+            numerator = design_charge * SQ_FT + minimum_sq_ft * material
+            denominator = SQ_FT
+            exact = True
+        else:
+            numerator = design_charge * _SQ_FT_AREA + area * material
+            denominator = _SQ_FT_AREA
+            exact = area % 9 == 0
+
+        if surcharge_percent and (
+            (surcharge_width and width > surcharge_width)
+            or (surcharge_height and height > surcharge_height)
+        ):
+            numerator *= 100 * PERCENT + surcharge_percent
+            denominator *= 100 * PERCENT
+
+        numerator += rise * denominator
+        return round_cents(numerator, denominator, exact)
+
+    def drawer_cents(self, wood_stock_id, bottom_id, width, height, depth,
+                     undermount=False, finishing=False) -> Optional[int]:
+        """Drawer unit price in cents, or None if the Decimal path must be used.
+
+        ``width``, ``height`` and ``depth`` are Decimal inches.
+        """
+        if not self.drawer_tables:
+            return None
+        try:
+            base = self.drawer_wood_stocks[int(wood_stock_id)] + self.drawer_bottoms[int(bottom_id)]
+        except (KeyError, TypeError, ValueError):
+            return None
+        scaled_width, scaled_height, scaled_depth = width * INCH, height * INCH, depth * INCH
+        width, height, depth = int(scaled_width), int(scaled_height), int(scaled_depth)
+        if width != scaled_width or height != scaled_height or depth != scaled_depth:
+            return None
+
+        if self.drawer_tiers:
+            index = bisect.bisect_left(self.drawer_tier_heights, height)
+            base += self.drawer_tiers[min(index, len(self.drawer_tiers) - 1)][1]
+        if undermount:
+            base += self.undermount_charge
+        if finishing:
+            base += self.finish_charge
+
+        surcharge = highest_surcharge(self.surcharges_by_width, self.surcharges_by_depth, width, depth)
+        if surcharge is None:
+            return round_cents(base, 1)
+        return round_cents(base * (100 * PERCENT + surcharge), 100 * PERCENT)
+
+    def as_table(self) -> dict:
+        """JSON-ready copy of the kernel for the client-side preview evaluator.
+
+        Mirrors door_cents / drawer_cents field for field (see
+        static/js/pricing-table.js). ``drawers`` is None when the drawer
+        tables are off the grid, so the client asks the server instead.
+        """
+        drawers = None
+        if self.drawer_tables:
+            drawers = {
+                'wood_stocks': {str(pk): price for pk, price in self.drawer_wood_stocks.items()},
+                'bottoms': {str(pk): price for pk, price in self.drawer_bottoms.items()},
+                'tiers': [list(tier) for tier in self.drawer_tiers],
+                'surcharges': [list(row) for row in self.dimension_surcharges],
+                'undermount_charge': self.undermount_charge,
+                'finish_charge': self.finish_charge,
+            }
+        return {
+            'version': self.version,
+            'units': {'inch': INCH, 'dollar': DOLLAR, 'percent': PERCENT, 'sq_ft': SQ_FT},
+            'doors': {
+                'wood_stocks': {str(pk): list(prices) for pk, prices in self.wood_stocks.items()},
+                'styles': {
+                    str(pk): [style.design_charge, style.minimum_sq_ft, style.surcharge_width,
+                              style.surcharge_height, style.surcharge_percent,
+                              style.use_flat_panel_price]
+                    for pk, style in self.styles.items()
+                },
+                'panel_rises': {str(pk): charge for pk, charge in self.panel_rises.items()},
+            },
+            'drawers': drawers,
+        }
+
+
+_kernel_lock = threading.Lock()
+_kernel: Optional[FixedPointKernel] = None
+
+
+def get_fixed_point_kernel(catalog: PricingCatalog) -> FixedPointKernel:
+    """Return the kernel for ``catalog``, converting it once per catalog version."""
+    global _kernel
+    kernel = _kernel
+    if kernel is not None and kernel.version == catalog.version:
+        return kernel
+    kernel = FixedPointKernel.from_catalog(catalog)
+    with _kernel_lock:
+        _kernel = kernel
+    return kernel
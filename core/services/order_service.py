@@ -2,12 +2,25 @@
 Service for handling order and quote operations.
 """
 from decimal import Decimal
-from django.db import transaction, DatabaseError, IntegrityError
+from django.db import connections, router, transaction, DatabaseError, IntegrityError
+from django.db.models import F
+from django.utils import timezone
 from ..models import Order
+from ..models.order import DERIVED_TOTAL_FIELDS
 from ..models.door import DoorLineItem
 from ..models.drawer import DrawerLineItem
 from ..models.line_item import GenericLineItem
 from .door_defaults_service import DoorDefaultsService
+from .pricing_service import price_line_items, get_catalog_for_specs, spec_from_line_item
+
+
+# Quotes deleted per transaction by delete_quotes; each chunk also deletes
+# the chunk's line items, so this bounds how long SQLite stays write-locked
+BULK_DELETE_CHUNK_SIZE = 25
+
+
+class OrderConflictError(Exception):
+    """An order or quote was saved by someone else since it was loaded."""
 
 
 class OrderService:
@@ -44,7 +57,7 @@ class OrderService:
                 # Create the order/quote base object
                 order_instance = OrderService._create_order_base(form_data, is_quote)
                 # Process all line items
-                items_count = OrderService._process_line_items(order_instance, session_data.get('items', []))
+                OrderService._process_line_items(order_instance, session_data.get('items', []))
 
                 # Calculate and save totals
                 order_instance.calculate_totals()
@@ -119,39 +132,130 @@ class OrderService:
         return order
 
     @staticmethod
-    def _process_line_items(order, line_items):
+    def _process_line_items(order, line_items, replaced=None, door_defaults=None):
         """
         Process all line items and add them to the order.
+        All items are priced up front in a single batch pass, the pricing
+        catalog version used is recorded on the order, and the items are
+        inserted with one bulk_create per item type. Items replacing a saved
+        row are written over it with one bulk_update per item type instead,
+        keeping its id and created_at. Callers run this inside their
+        transaction.atomic() block.
         
         Args:
             order (Order): The order instance
             line_items (list): List of line item dictionaries from session
+            replaced (dict): Optional saved line items to overwrite, keyed by
+                the (type, id) of the session items replacing them
+            door_defaults (dict): Optional result of _door_line_item_defaults for the order
             
         Returns:
-            int: Number of line items processed
+            list: The created and updated line items
         """
-        items_count = 0
-        for item in line_items:
-            items_count += 1
+        catalog = get_catalog_for_specs(line_items)
+        prices = price_line_items(line_items, catalog)
+        order.pricing_version = catalog.version
+
+        replaced = replaced or {}
+        created = []
+        updated = []
+        for item, priced in zip(line_items, prices):
             item_type = item.get('type')
             
             if item_type == 'door':
-                OrderService._create_door_line_item(order, item)
+                if door_defaults is None:
+                    door_defaults = OrderService._door_line_item_defaults(order)
+                line_item = OrderService._build_door_line_item(order, item, priced, door_defaults)
             elif item_type == 'drawer':
-                OrderService._create_drawer_line_item(order, item)
+                line_item = OrderService._build_drawer_line_item(order, item, priced)
             elif item_type == 'other':
-                OrderService._create_generic_line_item(order, item)
+                line_item = OrderService._build_generic_line_item(order, item)
+            else:
+                continue
+            # bulk_create skips save(), so price the item here
+            line_item.apply_pricing()
+            row = replaced.get((item_type, item.get('id')))
+            if row is not None:
+                line_item.pk = row.pk
+                line_item.created_at = row.created_at
+                line_item.updated_at = timezone.now()
+                updated.append(line_item)
+            else:
+                created.append(line_item)
+
+        for model in (DoorLineItem, DrawerLineItem, GenericLineItem):
+            model.objects.bulk_create([line_item for line_item in created if type(line_item) is model])
+            rows = [line_item for line_item in updated if type(line_item) is model]
+            if rows:
+                fields = [field.name for field in model._meta.concrete_fields
+                          if not field.primary_key and field.name not in ('order', 'created_at')]
+                model.objects.bulk_update(rows, fields)
+
+        return created + updated
+
+    @staticmethod
+    def _session_item_matches(row, item_data, door_defaults=None):
+        """
+        Whether a saved line item already holds everything a session item
+        describes, its price per unit included. Door rows are also compared
+        with the rail sizes and sanding options a rebuilt row would take from
+        door_defaults, so doors of an order moved to another customer are
+        rewritten with that customer's settings.
 
-        return items_count
+        Args:
+            row (BaseLineItem): The saved line item
+            item_data (dict): The line item data from session
+            door_defaults (dict): The result of _door_line_item_defaults for
+                the order, required for door rows
+        """
+        values = {
+            'quantity': int(item_data['quantity']),
+            'custom_price': bool(item_data.get('custom_price', False)),
+            'price_per_unit': Decimal(str(item_data['price_per_unit'])),
+        }
+        if row.type == 'door':
+            global_defaults = door_defaults['global']
+            for name in ('wood_stock', 'edge_profile', 'panel_rise', 'style'):
+                values[f'{name}_id'] = item_data[name]['id']
+            values['width'] = Decimal(item_data['width'])
+            values['height'] = Decimal(item_data['height'])
+            for name in ('rail_top', 'rail_bottom', 'rail_left', 'rail_right'):
+                values[name] = Decimal(item_data.get(name, global_defaults[name]))
+            for name in ('interior_rail_size', 'sand_edge', 'sand_cross_grain'):
+                values[name] = door_defaults[name]
+        elif row.type == 'drawer':
+            values.update(
+                wood_stock_id=item_data['wood_stock']['id'],
+                bottom_id=item_data['bottom']['id'],
+                width=Decimal(item_data['width']),
+                height=Decimal(item_data['height']),
+                depth=Decimal(item_data['depth']),
+                undermount=bool(item_data.get('undermount', False)),
+                finishing=bool(item_data.get('finishing', False)),
+            )
+        else:
+            values['name'] = item_data.get('name')
+        return all(getattr(row, field) == value for field, value in values.items())
 
     @staticmethod
     def update_from_session(order, form_data, session_data):
         """
         Update an existing order/quote from form data and session data.
-        Deletes all existing line items and recreates them from the session.
+        Session items carry the 'id' given by serialize_to_session (kept when
+        an item is edited), so only the difference is written: saved rows no
+        longer in the session are deleted, rows whose session item changed
+        are updated in place and repriced, items without an id are created,
+        and unchanged rows are left alone with their stored prices. The
+        stored line item summary is adjusted by the written rows only.
+
+        The save only goes ahead if the order is still at form_data's
+        'version' (see claim_version).
 
         Returns:
             tuple: (success, order, error_message)
+
+        Raises:
+            OrderConflictError: The order was saved by someone else since it was loaded
         """
         is_valid, error = OrderService._validate_session_data(form_data, session_data)
         if not is_valid:
@@ -159,22 +263,68 @@ class OrderService:
 
         try:
             with transaction.atomic():
+                OrderService.claim_version(order, form_data.get('version'))
+                # Read the saved rows afresh rather than from a with_items() prefetch
+                order.clear_line_item_cache()
                 order.customer = form_data['customer']
                 order.billing_address1 = form_data['billing_address1']
                 order.billing_address2 = form_data.get('billing_address2', '')
                 order.order_date = form_data['order_date']
                 order.notes = form_data.get('notes', '')
 
-                order.door_items.all().delete()
-                order.drawer_items.all().delete()
-                order.generic_items.all().delete()
+                items = session_data.get('items', [])
+                item_sets = {
+                    'door': order.door_items,
+                    'drawer': order.drawer_items,
+                    'other': order.generic_items,
+                }
+                saved = {}
+                removed = []
+                for item_type, item_set in item_sets.items():
+                    ids = {item['id'] for item in items if item.get('type') == item_type and item.get('id')}
+                    for row in item_set.filter(id__in=ids):
+                        saved[(item_type, row.pk)] = row
+                    stale = list(item_set.exclude(id__in=ids).only(
+                        'id', 'order_id', 'custom_price', 'price_per_unit', 'quantity'))
+                    if stale:
+                        item_set.filter(id__in=[row.pk for row in stale]).delete()
+                        removed += stale
 
-                OrderService._process_line_items(order, session_data.get('items', []))
-                order.calculate_totals()
+                # Looked up after order.customer is set, for kept and rebuilt doors alike
+                door_defaults = None
+                if any(item.get('type') == 'door' for item in items):
+                    door_defaults = OrderService._door_line_item_defaults(order)
+
+                kept = []
+                changed = []
+                replaced = {}
+                for item in items:
+                    key = (item.get('type'), item.get('id'))
+                    row = saved.pop(key, None)
+                    if row is None:
+                        # A new item, or a repeated id that is saved as a new row
+                        changed.append(dict(item, id=None))
+                    elif OrderService._session_item_matches(row, item, door_defaults):
+                        kept.append(row)
+                    else:
+                        replaced[key] = row
+                        changed.append(item)
+
+                pricing_version = order.pricing_version
+                added = OrderService._process_line_items(order, changed, replaced, door_defaults)
+                removed += replaced.values()
+                order.clear_line_item_cache()
+                # Kept lines still carry the prices of the earlier version
+                if any(not row.custom_price for row in kept if row.type in ('door', 'drawer')):
+                    order.pricing_version = pricing_version
+
+                order.apply_line_item_changes(added=added, removed=removed)
                 order.save()
 
                 return True, order, None
 
+        except OrderConflictError:
+            raise
         except IntegrityError as e:
             return False, None, f"Data integrity error: {str(e)}"
         except DatabaseError as e:
@@ -182,18 +332,319 @@ class OrderService:
         except Exception as e:
             return False, None, f"Error updating {'quote' if order.is_quote else 'order'}: {str(e)}"
 
+    @staticmethod
+    def claim_version(order, expected=None):
+        """
+        Move an order to its next version with one conditional UPDATE, if it
+        is still at the expected version (by default the one it was loaded
+        with). Call it first in the transaction that saves the order: no row
+        is locked while the user edits, and SQLite's write lock is only held
+        for the length of the save, so a second editor's save waits for the
+        first and is then rejected instead of overwriting it.
+
+        Raises:
+            OrderConflictError: The order was saved by someone else since it was loaded
+        """
+        expected = order.version if expected is None else expected
+        claimed = Order.objects.filter(pk=order.pk, version=expected).update(version=F('version') + 1)
+        if not claimed:
+            label = 'quote' if order.is_quote else 'order'
+            raise OrderConflictError(
+                f"This {label} was changed by someone else after you opened it. "
+                f"Reload it to see the current version."
+            )
+        order.version = expected + 1
+
+    @staticmethod
+    def remove_line_item(order, item_id, expected_version):
+        """
+        Delete one saved door or drawer line item and take it out of the
+        order's line item summary and totals in the same transaction.
+
+        Args:
+            order (Order): The order the item belongs to
+            item_id (int): The id of the door or drawer line item
+            expected_version (int): The order version the client's page was
+                rendered with
+
+        Returns:
+            bool: Whether an item was found and removed
+
+        Raises:
+            OrderConflictError: The order was saved by someone else since it was loaded
+        """
+        with transaction.atomic():
+            OrderService.claim_version(order, expected_version)
+            for item_set in (order.door_items, order.drawer_items):
+                item = item_set.filter(id=item_id).first()
+                if item is not None:
+                    item.delete()
+                    order.clear_line_item_cache()
+                    order.apply_line_item_changes(removed=[item])
+                    order.save()
+                    return True
+        return False
+
+    @staticmethod
+    def reprice_order(order, expected_version=None):
+        """
+        Reprice every calculated line item of an order against the current
+        pricing catalog and recalculate its totals. Custom-priced and
+        miscellaneous items keep their prices.
+
+        Args:
+            order (Order): The order or quote to reprice
+            expected_version (int): The order version the client's page was
+                rendered with; by default the version the order was loaded with
+
+        Returns:
+            tuple: (success, order, error_message)
+
+        Raises:
+            OrderConflictError: The order was saved by someone else since the
+                expected version
+        """
+        try:
+            with transaction.atomic():
+                OrderService.claim_version(order, expected_version)
+                line_items = order.line_items
+                specs = [spec_from_line_item(item) for item in line_items]
+                catalog = get_catalog_for_specs(specs)
+                prices = price_line_items(specs, catalog)
+
+                updated = {DoorLineItem: [], DrawerLineItem: []}
+                for item, priced in zip(line_items, prices):
+                    if priced.custom_price or type(item) not in updated:
+                        continue
+                    before = OrderService._stored_pricing(item)
+                    item._batch_unit_price = priced.unit_price
+                    item._batch_breakdown = priced.breakdown
+                    item.apply_pricing()
+                    # Only write the lines whose price or breakdown moved
+                    if OrderService._stored_pricing(item) != before:
+                        updated[type(item)].append(item)
+
+                for model, items in updated.items():
+                    if items:
+                        model.objects.bulk_update(items, ['price_per_unit', *model.BREAKDOWN_FIELDS])
+
+                order.pricing_version = catalog.version
+                order.calculate_totals()
+                order.save()
+
+                return True, order, None
+
+        except OrderConflictError:
+            raise
+        except DatabaseError as e:
+            return False, None, f"Database error: {str(e)}"
+        except Exception as e:
+            return False, None, f"Error repricing {'quote' if order.is_quote else 'order'}: {str(e)}"
+
+    @staticmethod
+    def _stored_pricing(item):
+        """A line item's price and breakdown columns, rounded as the database stores them."""
+        connection = connections[router.db_for_write(type(item))]
+        return [
+            field.get_db_prep_save(getattr(item, field.attname), connection)
+            for field in map(item._meta.get_field, ('price_per_unit', *item.BREAKDOWN_FIELDS))
+        ]
+
+    @staticmethod
+    def duplicate_order(order, as_quote=True, reprice=False):
+        """
+        Copy an order or quote with all of its line items, dated today, for
+        a repeat job. The line items are copied with one INSERT ... SELECT per
+        item table, so the cost does not depend on the number of lines. The
+        copy keeps the stored prices unless reprice is set, in which case it
+        is repriced against the current pricing catalog like reprice_order.
+        Discount, surcharge, shipping and tax follow the customer's current
+        defaults.
+
+        Returns:
+            tuple: (success, order, error_message)
+        """
+        try:
+            with transaction.atomic():
+                copied = {
+                    field.attname: getattr(order, field.attname)
+                    for field in Order._meta.concrete_fields
+                    if field.name not in ('id', 'created_at', 'updated_at', 'version')
+                }
+                duplicate = Order(**copied)
+                duplicate.is_quote = as_quote
+                duplicate.order_date = timezone.localdate()
+                duplicate.derive_totals()
+                duplicate.save()
+
+                now = timezone.now()
+                for model in (DoorLineItem, DrawerLineItem, GenericLineItem):
+                    OrderService._copy_line_items(model, order, duplicate, now)
+
+                if reprice:
+                    success, duplicate, error = OrderService.reprice_order(
+                        Order.objects.with_items().get(pk=duplicate.pk)
+                    )
+                    if not success:
+                        transaction.set_rollback(True)
+                        return False, None, error
+
+                return True, duplicate, None
+
+        except DatabaseError as e:
+            return False, None, f"Database error: {str(e)}"
+        except Exception as e:
+            return False, None, f"Error copying {'quote' if order.is_quote else 'order'}: {str(e)}"
+
+    @staticmethod
+    def _copy_line_items(model, source, target, now):
+        """
+        Copy one item table's rows of the source order to the target order
+        with a single INSERT ... SELECT. The copies are created and updated
+        at ``now``, like the order they belong to, and are inserted in the
+        source rows' id order.
+
+        Returns:
+            int: Number of rows copied
+        """
+        meta = model._meta
+        connection = connections[router.db_for_write(model)]
+        quote_name = connection.ops.quote_name
+        columns, selected, params = [], [], []
+        for field in meta.concrete_fields:
+            if field.primary_key:
+                continue
+            columns.append(quote_name(field.column))
+            if field.name == 'order':
+                selected.append('%s')
+                params.append(target.pk)
+            elif field.name in ('created_at', 'updated_at'):
+                selected.append('%s')
+                params.append(field.get_db_prep_save(now, connection))
+            else:
+                selected.append(quote_name(field.column))
+        table = quote_name(meta.db_table)
+        sql = (
+            f"INSERT INTO {table} ({', '.join(columns)}) "
+            f"SELECT {', '.join(selected)} FROM {table} "
+            f"WHERE {quote_name(meta.get_field('order').column)} = %s "
+            f"ORDER BY {quote_name(meta.pk.column)}"
+        )
+        params.append(source.pk)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.rowcount
+
+    @staticmethod
+    def convert_quotes(quote_ids):
+        """
+        Convert the given quotes to orders with a single UPDATE. Ids of
+        orders that are not quotes are ignored. The version moves on, so
+        anyone still editing one of the quotes cannot save over it.
+
+        Returns:
+            int: Number of quotes converted
+        """
+        with transaction.atomic():
+            return Order.quotes.filter(pk__in=quote_ids).update(
+                is_quote=False, version=F('version') + 1, updated_at=timezone.now()
+            )
+
+    @staticmethod
+    def delete_quotes(quote_ids, chunk_size=BULK_DELETE_CHUNK_SIZE):
+        """
+        Delete the given quotes and their line items. Ids of orders that are
+        not quotes are ignored. Quotes are deleted chunk_size at a time, each
+        chunk in its own transaction with one DELETE per line item table and
+        one for the quotes, so other workstations can save in between.
+
+        Returns:
+            int: Number of quotes deleted
+        """
+        quote_ids = sorted(set(quote_ids))
+        deleted = 0
+        for start in range(0, len(quote_ids), chunk_size):
+            with transaction.atomic():
+                _, counts = Order.quotes.filter(pk__in=quote_ids[start:start + chunk_size]).only('id').delete()
+                deleted += counts.get(Order._meta.label, 0)
+        return deleted
+
+    @staticmethod
+    def recalculate_customer_quotes(customer):
+        """
+        Derive discount, surcharge, shipping, tax and total again for every
+        quote of a customer from its stored item total and the customer's
+        current defaults, after those defaults changed. The quotes are read
+        without their line items and written back with one bulk_update.
+
+        Returns:
+            int: Number of quotes whose totals changed
+        """
+        with transaction.atomic():
+            # Re-read the customer, as the caller's instance may hold the defaults it had before saving
+            customer = type(customer).objects.select_related('defaults').get(pk=customer.pk)
+            now = timezone.now()
+            changed = []
+            for quote in Order.quotes.filter(customer=customer).only('id', 'item_total', *DERIVED_TOTAL_FIELDS):
+                quote.customer = customer
+                before = [getattr(quote, field) for field in DERIVED_TOTAL_FIELDS]
+                quote.derive_totals()
+                if [getattr(quote, field) for field in DERIVED_TOTAL_FIELDS] != before:
+                    quote.updated_at = now
+                    quote.version = F('version') + 1
+                    changed.append(quote)
+            Order.objects.bulk_update(changed, [*DERIVED_TOTAL_FIELDS, 'updated_at', 'version'], batch_size=500)
+        return len(changed)
+
+    @staticmethod
+    def reprice_session_items(items):
+        """
+        Reprice a list of session-format line items in place in one batch
+        against the current pricing catalog. Custom-priced and miscellaneous
+        items keep their prices. Saved items whose price changed keep their
+        'id'; update_from_session sees the new price and updates the row.
+
+        Returns:
+            tuple: (success, prices, error_message) where prices holds one
+            dict per item with its index, price_per_unit, total_price and
+            whether the price changed.
+        """
+        try:
+            priced_items = price_line_items(items)
+        except Exception as e:
+            return False, None, f"Error repricing items: {str(e)}"
+
+        prices = []
+        for index, (item, priced) in enumerate(zip(items, priced_items)):
+            price_per_unit = str(priced.unit_price.quantize(Decimal('0.01')))
+            total_price = str(priced.total_price)
+            changed = (Decimal(str(item.get('price_per_unit') or '0')) != priced.unit_price
+                       or Decimal(str(item.get('total_price') or '0')) != priced.total_price)
+            if changed:
+                item['price_per_unit'] = price_per_unit
+                item['total_price'] = total_price
+            prices.append({
+                'index': index,
+                'price_per_unit': price_per_unit,
+                'total_price': total_price,
+                'changed': changed,
+            })
+        return True, prices, None
+
     @staticmethod
     def serialize_to_session(order):
         """
         Convert an order's DB line items into the session dictionary format
         used by line_items_table.html. Returns the full session data dict.
+        The line items are read from the Order.objects.with_items() prefetch,
+        which is loaded here if the order did not come with it.
         """
         items = []
+        order.prefetch_line_items()
 
-        for item in order.door_items.all().select_related(
-            'wood_stock', 'edge_profile', 'panel_rise', 'style'
-        ):
+        for item in order.door_items.all():
             items.append({
+                'id': item.pk,
                 'type': 'door',
                 'wood_stock': {'id': item.wood_stock_id, 'name': item.wood_stock.name},
                 'edge_profile': {'id': item.edge_profile_id, 'name': item.edge_profile.name},
@@ -212,8 +663,9 @@ class OrderService:
                 'custom_price': item.custom_price,
             })
 
-        for item in order.drawer_items.all().select_related('wood_stock', 'bottom'):
+        for item in order.drawer_items.all():
             items.append({
+                'id': item.pk,
                 'type': 'drawer',
                 'wood_stock': {'id': item.wood_stock_id, 'name': item.wood_stock.name},
                 'bottom': {'id': item.bottom_id, 'name': item.bottom.name},
@@ -230,6 +682,7 @@ class OrderService:
 
         for item in order.generic_items.all():
             items.append({
+                'id': item.pk,
                 'type': 'other',
                 'name': item.name,
                 'quantity': str(item.quantity),
@@ -246,16 +699,45 @@ class OrderService:
         }
 
     @staticmethod
-    def _create_door_line_item(order, item_data):
+    def _door_line_item_defaults(order):
+        """
+        Look up the rail sizes and sanding options that door line items of an
+        order take from the customer and global defaults, once per order.
+
+        Returns:
+            dict: The global rail defaults, interior_rail_size, sand_edge and sand_cross_grain
+        """
+        door_defaults_service = DoorDefaultsService()
+        global_defaults = door_defaults_service.global_defaults
+
+        # Get customer-specific interior rail size or global default
+        interior_rail_size = door_defaults_service.get_rail_size(
+            order.customer, 
+            'interior_rail_size'
+        ) if order.customer else global_defaults['interior_rail_size']
+        
+        # Get customer defaults for sanding options
+        customer_defaults = door_defaults_service.get_defaults(order.customer) if order.customer else {}
+        return {
+            'global': global_defaults,
+            'interior_rail_size': interior_rail_size,
+            'sand_edge': customer_defaults.get('sand_edge', False),
+            'sand_cross_grain': customer_defaults.get('sand_cross_grain', False),
+        }
+
+    @staticmethod
+    def _build_door_line_item(order, item_data, priced=None, door_defaults=None):
         """
-        Create a door line item from session data.
+        Build an unsaved door line item from session data.
         
         Args:
             order (Order): The order to attach the item to
             item_data (dict): The line item data from session
+            priced (LineItemPrice): Optional batch pricing result for this item
+            door_defaults (dict): Optional result of _door_line_item_defaults for the order
             
         Returns:
-            DoorLineItem: The created door line item
+            DoorLineItem: The unsaved door line item
         """
         # Get door components
         width = Decimal(item_data['width'])
@@ -267,22 +749,13 @@ class OrderService:
         price_per_unit = Decimal(item_data['price_per_unit']) if custom_price else Decimal('0.00')
         
         # Get rail values from session if available, otherwise use defaults
-        door_defaults_service = DoorDefaultsService()
-        
-        # Get customer-specific interior rail size or global default
-        interior_rail_size = door_defaults_service.get_rail_size(
-            order.customer, 
-            'interior_rail_size'
-        ) if order.customer else door_defaults_service.global_defaults['interior_rail_size']
-        
-        # Get customer defaults for sanding options
-        customer_defaults = door_defaults_service.get_defaults(order.customer) if order.customer else {}
-        sand_edge = customer_defaults.get('sand_edge', False)
-        sand_cross_grain = customer_defaults.get('sand_cross_grain', False)
+        door_defaults = door_defaults or OrderService._door_line_item_defaults(order)
+        global_defaults = door_defaults['global']
         
-        # Create door line item
+        # Build door line item
         door_item = DoorLineItem(
             order=order,
+            type='door',
             wood_stock_id=item_data['wood_stock']['id'],
             edge_profile_id=item_data['edge_profile']['id'],
             panel_rise_id=item_data['panel_rise']['id'],
@@ -291,29 +764,32 @@ class OrderService:
             height=height,
             quantity=quantity,
             price_per_unit=price_per_unit,
-            rail_top=Decimal(item_data.get('rail_top', door_defaults_service.global_defaults['rail_top'])),
-            rail_bottom=Decimal(item_data.get('rail_bottom', door_defaults_service.global_defaults['rail_bottom'])),
-            rail_left=Decimal(item_data.get('rail_left', door_defaults_service.global_defaults['rail_left'])),
-            rail_right=Decimal(item_data.get('rail_right', door_defaults_service.global_defaults['rail_right'])),
-            interior_rail_size=interior_rail_size,
+            rail_top=Decimal(item_data.get('rail_top', global_defaults['rail_top'])),
+            rail_bottom=Decimal(item_data.get('rail_bottom', global_defaults['rail_bottom'])),
+            rail_left=Decimal(item_data.get('rail_left', global_defaults['rail_left'])),
+            rail_right=Decimal(item_data.get('rail_right', global_defaults['rail_right'])),
+            interior_rail_size=door_defaults['interior_rail_size'],
             custom_price=custom_price,
-            sand_edge=sand_edge,
-            sand_cross_grain=sand_cross_grain
+            sand_edge=door_defaults['sand_edge'],
+            sand_cross_grain=door_defaults['sand_cross_grain']
         )
-        door_item.save()
+        if priced is not None and not priced.custom_price:
+            door_item._batch_unit_price = priced.unit_price
+            door_item._batch_breakdown = priced.breakdown
         return door_item
 
     @staticmethod
-    def _create_drawer_line_item(order, item_data):
+    def _build_drawer_line_item(order, item_data, priced=None):
         """
-        Create a drawer line item from session data.
+        Build an unsaved drawer line item from session data.
         
         Args:
             order (Order): The order to attach the item to
             item_data (dict): The line item data from session
+            priced (LineItemPrice): Optional batch pricing result for this item
             
         Returns:
-            DrawerLineItem: The created drawer line item
+            DrawerLineItem: The unsaved drawer line item
         """
         # Get drawer components
         width = Decimal(item_data['width'])
@@ -325,9 +801,10 @@ class OrderService:
         # Only use the stored price_per_unit if custom_price is True
         price_per_unit = Decimal(item_data['price_per_unit']) if custom_price else Decimal('0.00')
         
-        # Create drawer line item
+        # Build drawer line item
         drawer_item = DrawerLineItem(
             order=order,
+            type='drawer',
             wood_stock_id=item_data['wood_stock']['id'],
             bottom_id=item_data['bottom']['id'],
             width=width,
@@ -339,20 +816,22 @@ class OrderService:
             finishing=item_data.get('finishing', False),
             custom_price=custom_price
         )
-        drawer_item.save()
+        if priced is not None and not priced.custom_price:
+            drawer_item._batch_unit_price = priced.unit_price
+            drawer_item._batch_breakdown = priced.breakdown
         return drawer_item
 
     @staticmethod
-    def _create_generic_line_item(order, item_data):
+    def _build_generic_line_item(order, item_data):
         """
-        Create a generic line item from session data.
+        Build an unsaved generic line item from session data.
         
         Args:
             order (Order): The order to attach the item to
             item_data (dict): The line item data from session
             
         Returns:
-            GenericLineItem: The created generic line item
+            GenericLineItem: The unsaved generic line item
         """
         # Get item details
         name = item_data.get('name')
@@ -362,13 +841,13 @@ class OrderService:
         # Price per unit is always required for generic items
         price_per_unit = Decimal(item_data.get('price_per_unit'))
         
-        # Create generic line item
+        # Build generic line item
         generic_item = GenericLineItem(
             order=order,
+            type='other',
             name=name,
             quantity=quantity,
             price_per_unit=price_per_unit,
             custom_price=custom_price
         )
-        generic_item.save()
         return generic_item 
\ No newline at end of file
@@ -0,0 +1,199 @@
+"""
+Printable door and drawer price lists.
+
+A price sheet tabulates unit prices over a grid of sizes: for doors, one
+table of heights x widths per (style, wood stock) pair; for drawers, one
+table per (wood stock, bottom, depth). Every cell of every table is priced
+in a single vectorized pass with the NumPy pricing functions of the
+pricing simulator, so a sheet of tens of thousands of prices takes
+milliseconds and never builds a line item. The sheet is rendered as a PDF
+(templates/pdf/price_sheet_pdf.html) or as a flat CSV.
+"""
+import csv
+import datetime
+import io
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.utils import timezone
+
+from ..models.door import WoodStock, Style, PanelRise
+from ..models.drawer import DrawerWoodStock, DrawerBottomSize
+from .pricing_catalog import PricingCatalog, get_pricing_catalog
+from .pricing_simulator import door_unit_prices, drawer_unit_prices
+
+
+@dataclass(frozen=True)
+class PriceTable:
+    """Unit prices of one product variant, heights down and widths across.
+
+    ``prices`` holds one row per height; a cell is None when the variant
+    cannot be priced (a settings row went missing).
+    """
+    title: str
+    labels: Tuple[Tuple[str, str], ...]      # (column name, value) pairs for the CSV
+    widths: Tuple[Decimal, ...]
+    heights: Tuple[Decimal, ...]
+    prices: Tuple[Tuple[Optional[Decimal], ...], ...]
+
+    @property
+    def rows(self):
+        """(height, prices) pairs for templates."""
+        return list(zip(self.heights, self.prices))
+
+
+@dataclass(frozen=True)
+class PriceSheet:
+    title: str
+    notes: Tuple[str, ...]
+    tables: List[PriceTable]
+    catalog_version: str
+    generated: datetime.date
+    cells: int
+    seconds: float
+
+
+def _names(model, ids):
+    return dict(model.objects.filter(pk__in=ids).values_list('pk', 'name'))
+
+
+def _grid(*axes):
+    """Cartesian product of ``axes`` as flat float64 columns, first axis slowest."""
+    mesh = np.meshgrid(*(np.asarray(axis, dtype=np.float64) for axis in axes), indexing='ij')
+    return [column.ravel() for column in mesh]
+
+
+def _to_decimal(value) -> Optional[Decimal]:
+    return None if np.isnan(value) else Decimal(f'{value:.2f}')
+
+
+def _tables(prices, variants, widths, heights) -> List[PriceTable]:
+    """Split a (variants x heights x widths) price array into PriceTables."""
+    prices = prices.reshape(len(variants), len(heights), len(widths))
+    return [
+        PriceTable(
+            title=title,
+            labels=labels,
+            widths=tuple(widths),
+            heights=tuple(heights),
+            prices=tuple(tuple(_to_decimal(value) for value in row) for row in table),
+        )
+        for (title, labels), table in zip(variants, prices)
+    ]
+
+
+def door_price_sheet(widths: Sequence[Decimal], heights: Sequence[Decimal],
+                     style_ids: Optional[Sequence[int]] = None,
+                     wood_stock_ids: Optional[Sequence[int]] = None,
+                     panel_rise_id: Optional[int] = None,
+                     catalog: Optional[PricingCatalog] = None) -> PriceSheet:
+    """Door unit prices for every width x height, style and wood stock.
+
+    Blank ``style_ids`` / ``wood_stock_ids`` mean all of them.
+    """
+    start = time.perf_counter()
+    catalog = catalog or get_pricing_catalog()
+    style_ids = sorted(style_ids or catalog.styles)
+    wood_stock_ids = sorted(wood_stock_ids or catalog.wood_stocks)
+    style_names = _names(Style, style_ids)
+    wood_names = _names(WoodStock, wood_stock_ids)
+
+    pairs = [(style_id, wood_id) for style_id in style_ids for wood_id in wood_stock_ids]
+    style_column, wood_column, height_column, width_column = _grid(
+        style_ids, wood_stock_ids, heights, widths)
+    columns = {
+        'style_id': style_column,
+        'wood_stock_id': wood_column,
+        'panel_rise_id': np.full(len(width_column), np.nan if panel_rise_id is None else float(panel_rise_id)),
+        'width': width_column,
+        'height': height_column,
+    }
+    prices = door_unit_prices(catalog, columns)
+
+    variants = [
+        (f'{style_names.get(style_id, style_id)} / {wood_names.get(wood_id, wood_id)}',
+         (('Style', style_names.get(style_id, '')), ('Wood Stock', wood_names.get(wood_id, ''))))
+        for style_id, wood_id in pairs
+    ]
+    notes = ['Unit prices per door.']
+    if panel_rise_id is not None:
+        rise = PanelRise.objects.filter(pk=panel_rise_id).first()
+        notes.append(f'Includes the {rise.name if rise else "selected"} panel rise.')
+    return PriceSheet(
+        title='Door Price List',
+        notes=tuple(notes),
+        tables=_tables(prices, variants, widths, heights),
+        catalog_version=catalog.version,
+        generated=timezone.localdate(),
+        cells=len(prices),
+        seconds=time.perf_counter() - start,
+    )
+
+
+def drawer_price_sheet(widths: Sequence[Decimal], heights: Sequence[Decimal], depths: Sequence[Decimal],
+                       wood_stock_ids: Optional[Sequence[int]] = None,
+                       bottom_ids: Optional[Sequence[int]] = None,
+                       undermount: bool = False, finishing: bool = False,
+                       catalog: Optional[PricingCatalog] = None) -> PriceSheet:
+    """Drawer unit prices for every width x height, depth, wood stock and bottom.
+
+    Blank ``wood_stock_ids`` / ``bottom_ids`` mean all of them.
+    """
+    start = time.perf_counter()
+    catalog = catalog or get_pricing_catalog()
+    wood_stock_ids = sorted(wood_stock_ids or catalog.drawer_wood_stocks)
+    bottom_ids = sorted(bottom_ids or catalog.drawer_bottoms)
+    wood_names = _names(DrawerWoodStock, wood_stock_ids)
+    bottom_names = _names(DrawerBottomSize, bottom_ids)
+
+    wood_column, bottom_column, depth_column, height_column, width_column = _grid(
+        wood_stock_ids, bottom_ids, depths, heights, widths)
+    columns = {
+        'wood_stock_id': wood_column,
+        'bottom_id': bottom_column,
+        'width': width_column,
+        'height': height_column,
+        'depth': depth_column,
+        'undermount': np.full(len(width_column), float(undermount)),
+        'finishing': np.full(len(width_column), float(finishing)),
+    }
+    prices = drawer_unit_prices(catalog, columns)
+
+    variants = [
+        (f'{wood_names.get(wood_id, wood_id)} / {bottom_names.get(bottom_id, bottom_id)} / {depth}" deep',
+         (('Wood Stock', wood_names.get(wood_id, '')), ('Bottom', bottom_names.get(bottom_id, '')),
+          ('Depth', str(depth))))
+        for wood_id in wood_stock_ids for bottom_id in bottom_ids for depth in depths
+    ]
+    notes = ['Unit prices per drawer.']
+    if undermount:
+        notes.append('Includes undermount slides.')
+    if finishing:
+        notes.append('Includes finishing.')
+    return PriceSheet(
+        title='Drawer Price List',
+        notes=tuple(notes),
+        tables=_tables(prices, variants, widths, heights),
+        catalog_version=catalog.version,
+        generated=timezone.localdate(),
+        cells=len(prices),
+        seconds=time.perf_counter() - start,
+    )
+
+
+def price_sheet_csv(sheet: PriceSheet) -> str:
+    """The sheet as one CSV row per priced size."""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    if not sheet.tables:
+        return ''
+    writer.writerow([name for name, _ in sheet.tables[0].labels] + ['Width', 'Height', 'Unit Price'])
+    for table in sheet.tables:
+        values = [value for _, value in table.labels]
+        for height, prices in table.rows:
+            for width, price in zip(table.widths, prices):
+                writer.writerow(values + [width, height, '' if price is None else price])
+    return output.getvalue()
@@ -0,0 +1,495 @@
+"""
+Process-wide snapshot of the settings rows that drive line-item pricing.
+
+Pricing a door needs its WoodStock, Style (with PanelType and Design) and
+PanelRise. Walking those relations per line item costs several queries per
+door, so the rows are loaded once into an immutable catalog that is shared
+by every request thread. The drawer tables (wood stocks, bottoms, height
+tiers, dimension surcharges and the default option charges) ride along so
+a batch of mixed line items is priced from a single load. The settings
+views call bump_catalog_version() after each change and the next lookup
+rebuilds the snapshot. Rows written elsewhere (seed commands, scripts) are
+picked up when a lookup misses and the settings tables no longer match the
+stamp taken when the snapshot was loaded.
+
+Every door constant except the panel rise depends only on the (style, wood
+stock) pair, so the catalog also keeps a dense ``door_rates`` table of
+DoorRates per pair and price_door() is a single lookup plus arithmetic on
+width and height. ``manage.py benchmark_door_pricing`` measures the gain.
+Drawer height tiers are kept sorted by height and resolved with a binary
+search, so pricing a drawer never goes back to the database either.
+Dimension surcharges are indexed the same way: the positive width and depth
+thresholds are sorted with a running maximum of their surcharge, so the
+highest surcharge a drawer reaches is two binary searches.
+"""
+import bisect
+import hashlib
+import threading
+from dataclasses import dataclass, field
+from decimal import Decimal
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
+
+from django.db.models import Count, Max
+
+from ..models.door import WoodStock, Style, PanelRise
+from ..models.drawer import (
+    DrawerWoodStock, DrawerBottomSize, DrawerPricing,
+    DrawerDimensionSurcharge,
+)
+from .settings_registry import get_drawer_settings
+
+
+@dataclass(frozen=True)
+class WoodStockRates:
+    """Per square foot material prices for a door wood stock."""
+    raised_panel_price: Decimal
+    flat_panel_price: Decimal
+
+
+@dataclass(frozen=True)
+class StyleRates:
+    """Pricing constants of a door style, flattened from its PanelType and Design."""
+    design_charge: Decimal
+    minimum_sq_ft: Decimal
+    surcharge_width: Decimal
+    surcharge_height: Decimal
+    surcharge_percent: Decimal
+    use_flat_panel_price: bool
+
+
+@dataclass(frozen=True)
+class DoorRates:
+    """Pricing constants of one (style, wood stock) pair, precomputed for price_door()."""
+    design_charge: Decimal
+    material_cost: Decimal
+    minimum_sq_ft: Decimal
+    minimum_area: Decimal           # minimum_sq_ft in square inches
+    surcharge_width: Decimal
+    surcharge_height: Decimal
+    surcharge_percent: Decimal
+    surcharge_factor: Decimal       # 1 + surcharge_percent / 100
+
+    @classmethod
+    def combine(cls, style: StyleRates, wood: WoodStockRates) -> 'DoorRates':
+        return cls(
+            design_charge=style.design_charge,
+            material_cost=wood.flat_panel_price if style.use_flat_panel_price else wood.raised_panel_price,
+            minimum_sq_ft=style.minimum_sq_ft,
+            minimum_area=style.minimum_sq_ft * 144,
+            surcharge_width=style.surcharge_width,
+            surcharge_height=style.surcharge_height,
+            surcharge_percent=style.surcharge_percent,
+            surcharge_factor=1 + style.surcharge_percent / Decimal('100'),
+        )
+
+
+@dataclass(frozen=True)
+class DoorPriceBreakdown:
+    """Components of a door unit price."""
+    square_feet: Decimal
+    material_cost: Decimal
+    design_charge: Decimal
+    oversize_percent: Decimal
+    rise_surcharge: Decimal
+    unit_price: Decimal
+
+
+@dataclass(frozen=True)
+class DrawerTier:
+    """Base drawer price for drawers up to ``height`` inches tall."""
+    height: Decimal
+    price: Decimal
+
+
+@dataclass(frozen=True)
+class DimensionSurcharge:
+    """Surcharge applied when a drawer reaches the width or depth threshold."""
+    width: Decimal
+    depth: Decimal
+    surcharge_percent: Decimal
+
+
+@dataclass(frozen=True)
+class SurchargeIndex:
+    """Sorted surcharge thresholds with the highest surcharge up to each one."""
+    thresholds: Tuple
+    running_max: Tuple
+
+    @classmethod
+    def build(cls, rows) -> 'SurchargeIndex':
+        """Index (threshold, surcharge) pairs; thresholds of 0 or less never match."""
+        thresholds, running_max = [], []
+        for threshold, surcharge in sorted(row for row in rows if row[0] > 0):
+            thresholds.append(threshold)
+            running_max.append(max(surcharge, running_max[-1]) if running_max else surcharge)
+        return cls(tuple(thresholds), tuple(running_max))
+
+    def highest(self, value):
+        """Highest surcharge whose threshold is at most ``value``, or None."""
+        index = bisect.bisect_right(self.thresholds, value)
+        return self.running_max[index - 1] if index else None
+
+
+def highest_surcharge(by_width: SurchargeIndex, by_depth: SurchargeIndex, width, depth):
+    """Highest surcharge whose width or depth threshold is reached, or None."""
+    width_surcharge = by_width.highest(width)
+    depth_surcharge = by_depth.highest(depth)
+    if width_surcharge is None:
+        return depth_surcharge
+    if depth_surcharge is None:
+        return width_surcharge
+    return max(width_surcharge, depth_surcharge)
+
+
+@dataclass(frozen=True)
+class DrawerOptionCharges:
+    """Charges for optional drawer features from DefaultDrawerSettings."""
+    undermount_charge: Decimal
+    finish_charge: Decimal
+
+
+@dataclass(frozen=True)
+class DrawerPriceBreakdown:
+    """Components of a drawer unit price."""
+    tier_price: Decimal
+    wood_stock_price: Decimal
+    bottom_price: Decimal
+    undermount_charge: Decimal
+    finish_charge: Decimal
+    base_price: Decimal
+    surcharge_percent: Decimal
+    unit_price: Decimal
+
+
+@dataclass(frozen=True)
+class PricingCatalog:
+    """Immutable pricing snapshot. ``version`` fingerprints its contents."""
+    version: str
+    wood_stocks: Mapping[int, WoodStockRates]
+    styles: Mapping[int, StyleRates]
+    panel_rises: Mapping[int, Decimal]
+    drawer_wood_stocks: Mapping[int, Decimal]
+    drawer_bottoms: Mapping[int, Decimal]
+    drawer_tiers: Tuple[DrawerTier, ...]          # sorted by height
+    dimension_surcharges: Tuple[DimensionSurcharge, ...]
+    drawer_options: Optional[DrawerOptionCharges]
+    # Row count, highest id and last update of each keyed table when loaded
+    settings_stamp: Tuple = field(default=(), repr=False, compare=False)
+    # Derived from styles and wood_stocks, so dataclasses.replace() rebuilds it
+    door_rates: Mapping[Tuple[int, int], DoorRates] = field(init=False, repr=False, compare=False)
+    # Heights of drawer_tiers, for bisecting
+    drawer_tier_heights: Tuple[Decimal, ...] = field(init=False, repr=False, compare=False)
+    # dimension_surcharges indexed by width and by depth threshold
+    surcharges_by_width: SurchargeIndex = field(init=False, repr=False, compare=False)
+    surcharges_by_depth: SurchargeIndex = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        door_rates = {
+            (style_id, wood_id): DoorRates.combine(style, wood)
+            for style_id, style in self.styles.items()
+            for wood_id, wood in self.wood_stocks.items()
+        }
+        object.__setattr__(self, 'door_rates', MappingProxyType(door_rates))
+        object.__setattr__(self, 'drawer_tier_heights', tuple(tier.height for tier in self.drawer_tiers))
+        object.__setattr__(self, 'surcharges_by_width', SurchargeIndex.build(
+            (row.width, row.surcharge_percent) for row in self.dimension_surcharges))
+        object.__setattr__(self, 'surcharges_by_depth', SurchargeIndex.build(
+            (row.depth, row.surcharge_percent) for row in self.dimension_surcharges))
+
+    def wood_stock(self, wood_stock_id) -> WoodStockRates:
+        try:
+            return self.wood_stocks[int(wood_stock_id)]
+        except (KeyError, TypeError, ValueError):
+            raise WoodStock.DoesNotExist(f"WoodStock {wood_stock_id} is not in the pricing catalog")
+
+    def style(self, style_id) -> StyleRates:
+        try:
+            return self.styles[int(style_id)]
+        except (KeyError, TypeError, ValueError):
+            raise Style.DoesNotExist(f"Style {style_id} is not in the pricing catalog")
+
+    def panel_rise_surcharge(self, panel_rise_id) -> Decimal:
+        if panel_rise_id is None:
+            return Decimal('0.00')
+        try:
+            return self.panel_rises[int(panel_rise_id)]
+        except (KeyError, TypeError, ValueError):
+            raise PanelRise.DoesNotExist(f"PanelRise {panel_rise_id} is not in the pricing catalog")
+
+    def has_door_inputs(self, wood_stock_id, style_id, panel_rise_id=None) -> bool:
+        """Whether every row needed to price this door is in the snapshot."""
+        try:
+            self.wood_stock(wood_stock_id)
+            self.style(style_id)
+            self.panel_rise_surcharge(panel_rise_id)
+        except (WoodStock.DoesNotExist, Style.DoesNotExist, PanelRise.DoesNotExist):
+            return False
+        return True
+
+    def door_square_feet(self, style_id, width: Decimal, height: Decimal) -> Decimal:
+        """Square footage of a door, enforcing the panel type minimum."""
+        sq_ft = (width * height) / Decimal('144')
+        min_sq_ft = self.style(style_id).minimum_sq_ft
+        if min_sq_ft and sq_ft < min_sq_ft:
+            sq_ft = min_sq_ft
+        return sq_ft
+
+    def door_rate(self, style_id, wood_stock_id) -> DoorRates:
+        try:
+            return self.door_rates[int(style_id), int(wood_stock_id)]
+        except (KeyError, TypeError, ValueError):
+            # Raise the DoesNotExist of whichever row is missing
+            self.style(style_id)
+            self.wood_stock(wood_stock_id)
+            raise
+
+    def _door_price(self, rates: DoorRates, width: Decimal, height: Decimal):
+        """Return (square_feet, oversize_percent, price before panel rise) for one door."""
+        area = width * height
+        if rates.minimum_sq_ft and area < rates.minimum_area:
+            square_feet = rates.minimum_sq_ft
+        else:
+            square_feet = area / Decimal('144')
+        price = rates.design_charge + (square_feet * rates.material_cost)
+
+        if rates.surcharge_percent and (
+            (rates.surcharge_width and width > rates.surcharge_width)
+            or (rates.surcharge_height and height > rates.surcharge_height)
+        ):
+            return square_feet, rates.surcharge_percent, price * rates.surcharge_factor
+        return square_feet, Decimal('0.00'), price
+
+    def door_unit_price(self, wood_stock_id, style_id, panel_rise_id,
+                        width: Decimal, height: Decimal) -> Decimal:
+        """Unit price of one door, without building the breakdown."""
+        rates = self.door_rate(style_id, wood_stock_id)
+        price = self._door_price(rates, width, height)[2] + self.panel_rise_surcharge(panel_rise_id)
+        return price.quantize(Decimal('0.01'))
+
+    def price_door(self, wood_stock_id, style_id, panel_rise_id,
+                   width: Decimal, height: Decimal) -> DoorPriceBreakdown:
+        """Price one door.
+
+        Formula: Design Charge + (Square Feet x Material Cost per sq ft)
+                 + oversize surcharge (if applicable)
+                 + panel rise surcharge (if applicable)
+        """
+        rates = self.door_rate(style_id, wood_stock_id)
+        rise_surcharge = self.panel_rise_surcharge(panel_rise_id)
+        square_feet, oversize_percent, price = self._door_price(rates, width, height)
+
+        return DoorPriceBreakdown(
+            square_feet=square_feet,
+            material_cost=rates.material_cost,
+            design_charge=rates.design_charge,
+            oversize_percent=oversize_percent,
+            rise_surcharge=rise_surcharge,
+            unit_price=(price + rise_surcharge).quantize(Decimal('0.01')),
+        )
+
+    def drawer_wood_stock_price(self, wood_stock_id) -> Decimal:
+        try:
+            return self.drawer_wood_stocks[int(wood_stock_id)]
+        except (KeyError, TypeError, ValueError):
+            raise DrawerWoodStock.DoesNotExist(f"DrawerWoodStock {wood_stock_id} is not in the pricing catalog")
+
+    def drawer_bottom_price(self, bottom_id) -> Decimal:
+        try:
+            return self.drawer_bottoms[int(bottom_id)]
+        except (KeyError, TypeError, ValueError):
+            raise DrawerBottomSize.DoesNotExist(f"DrawerBottomSize {bottom_id} is not in the pricing catalog")
+
+    def has_drawer_inputs(self, wood_stock_id, bottom_id) -> bool:
+        """Whether every row needed to price this drawer is in the snapshot."""
+        try:
+            self.drawer_wood_stock_price(wood_stock_id)
+            self.drawer_bottom_price(bottom_id)
+        except (DrawerWoodStock.DoesNotExist, DrawerBottomSize.DoesNotExist):
+            return False
+        return True
+
+    def drawer_tier(self, height: Decimal) -> Optional[DrawerTier]:
+        """Smallest tier tall enough for the drawer, else the tallest tier."""
+        if not self.drawer_tiers:
+            return None
+        index = bisect.bisect_left(self.drawer_tier_heights, height)
+        return self.drawer_tiers[min(index, len(self.drawer_tiers) - 1)]
+
+    def drawer_surcharge_percent(self, width: Decimal, depth: Decimal) -> Optional[Decimal]:
+        """Highest surcharge whose width or depth threshold the drawer reaches."""
+        return highest_surcharge(self.surcharges_by_width, self.surcharges_by_depth, width, depth)
+
+    def price_drawer(self, wood_stock_id, bottom_id, width: Decimal, height: Decimal,
+                     depth: Decimal, undermount=False, finishing=False) -> DrawerPriceBreakdown:
+        """Price one drawer.
+
+        Formula: DrawerPricing tier base (by height)
+                 + WoodStock price + Bottom price
+                 + Undermount charge (if selected) + Finish charge (if selected)
+                 then x (1 + highest matching surcharge_percent/100) if oversized
+        """
+        wood_stock_price = self.drawer_wood_stock_price(wood_stock_id)
+        bottom_price = self.drawer_bottom_price(bottom_id)
+
+        tier = self.drawer_tier(height)
+        tier_price = tier.price if tier else Decimal('0.00')
+
+        undermount_charge = Decimal('0.00')
+        finish_charge = Decimal('0.00')
+        if self.drawer_options:
+            if undermount:
+                undermount_charge = self.drawer_options.undermount_charge
+            if finishing:
+                finish_charge = self.drawer_options.finish_charge
+
+        base_price = tier_price + wood_stock_price + bottom_price + undermount_charge + finish_charge
+
+        price = base_price
+        surcharge_percent = self.drawer_surcharge_percent(width, depth)
+        if surcharge_percent is not None:
+            price *= (1 + surcharge_percent / Decimal('100'))
+
+        return DrawerPriceBreakdown(
+            tier_price=tier_price,
+            wood_stock_price=wood_stock_price,
+            bottom_price=bottom_price,
+            undermount_charge=undermount_charge,
+            finish_charge=finish_charge,
+            base_price=base_price,
+            surcharge_percent=surcharge_percent if surcharge_percent is not None else Decimal('0.00'),
+            unit_price=price.quantize(Decimal('0.01')),
+        )
+
+
+_catalog_lock = threading.Lock()
+_catalog: Optional[PricingCatalog] = None
+
+
+def _fingerprint(*tables) -> str:
+    digest = hashlib.sha1()
+    for table in tables:
+        for key in sorted(table):
+            digest.update(f"{key}={table[key]!r};".encode())
+        digest.update(b'|')
+    return digest.hexdigest()[:12]
+
+
+def _settings_stamp() -> Tuple:
+    """Cheap summary of the tables the catalog looks rows up by id in."""
+    return tuple(
+        tuple(model.objects.aggregate(Count('pk'), Max('pk'), Max('updated_at')).values())
+        for model in (WoodStock, Style, PanelRise, DrawerWoodStock, DrawerBottomSize)
+    )
+
+
+def _load_catalog() -> PricingCatalog:
+    # Stamped before reading, so a write during the load shows up as a change
+    settings_stamp = _settings_stamp()
+    wood_stocks = {
+        wood.pk: WoodStockRates(
+            raised_panel_price=wood.raised_panel_price,
+            flat_panel_price=wood.flat_panel_price,
+        )
+        for wood in WoodStock.objects.all()
+    }
+    styles = {
+        style.pk: StyleRates(
+            design_charge=style.panel_type.design_charge + style.design.price,
+            minimum_sq_ft=style.panel_type.minimum_sq_ft,
+            surcharge_width=style.panel_type.surcharge_width,
+            surcharge_height=style.panel_type.surcharge_height,
+            surcharge_percent=style.panel_type.surcharge_percent,
+            use_flat_panel_price=style.panel_type.use_flat_panel_price,
+        )
+        for style in Style.objects.select_related('panel_type', 'design')
+    }
+    panel_rises = {rise.pk: rise.surcharge for rise in PanelRise.objects.all()}
+
+    drawer_wood_stocks = {wood.pk: wood.price for wood in DrawerWoodStock.objects.all()}
+    drawer_bottoms = {bottom.pk: bottom.price for bottom in DrawerBottomSize.objects.all()}
+    drawer_tiers = tuple(
+        DrawerTier(height=tier.height, price=tier.price)
+        for tier in DrawerPricing.objects.order_by('height', 'pk')
+    )
+    dimension_surcharges = tuple(
+        DimensionSurcharge(width=row.width, depth=row.depth, surcharge_percent=row.surcharge_percent)
+        for row in DrawerDimensionSurcharge.objects.order_by('pk')
+    )
+    default_settings = get_drawer_settings()
+    drawer_options = DrawerOptionCharges(
+        undermount_charge=default_settings.undermount_charge,
+        finish_charge=default_settings.finish_charge,
+    ) if default_settings else None
+
+    return PricingCatalog(
+        version=_fingerprint(
+            wood_stocks, styles, panel_rises, drawer_wood_stocks, drawer_bottoms,
+            dict(enumerate(drawer_tiers)), dict(enumerate(dimension_surcharges)),
+            {'options': drawer_options},
+        ),
+        wood_stocks=MappingProxyType(wood_stocks),
+        styles=MappingProxyType(styles),
+        panel_rises=MappingProxyType(panel_rises),
+        drawer_wood_stocks=MappingProxyType(drawer_wood_stocks),
+        drawer_bottoms=MappingProxyType(drawer_bottoms),
+        drawer_tiers=drawer_tiers,
+        dimension_surcharges=dimension_surcharges,
+        drawer_options=drawer_options,
+        settings_stamp=settings_stamp,
+    )
+
+
+def get_pricing_catalog() -> PricingCatalog:
+    """Return the current catalog, loading it on first use or after a bump."""
+    global _catalog
+    catalog = _catalog
+    if catalog is not None:
+        return catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = _load_catalog()
+        return _catalog
+
+
+def bump_catalog_version():
+    """Discard the current snapshot. Call after any pricing setting changes."""
+    global _catalog
+    with _catalog_lock:
+        _catalog = None
+
+
+def reload_if_settings_changed(catalog: PricingCatalog) -> PricingCatalog:
+    """Return a fresh catalog if the settings tables changed since ``catalog`` was loaded.
+
+    Called after a lookup misses. Ids that simply do not exist leave the
+    shared snapshot in place, so the catalog is reloaded at most once per
+    actual settings change.
+    """
+    global _catalog
+    if _settings_stamp() == catalog.settings_stamp:
+        return catalog
+    with _catalog_lock:
+        if _catalog is catalog:
+            _catalog = None
+    return get_pricing_catalog()
+
+
+def get_catalog_for_door(wood_stock_id, style_id, panel_rise_id=None) -> PricingCatalog:
+    """Return a catalog that contains the given door rows if they exist.
+
+    Rows written outside the settings views (seed commands, scripts) do not
+    bump the catalog, so a miss reloads it when the settings tables changed.
+    """
+    catalog = get_pricing_catalog()
+    if not catalog.has_door_inputs(wood_stock_id, style_id, panel_rise_id):
+        catalog = reload_if_settings_changed(catalog)
+    return catalog
+
+
+def get_catalog_for_drawer(wood_stock_id, bottom_id) -> PricingCatalog:
+    """Return a catalog that contains the given drawer rows if they exist (see get_catalog_for_door)."""
+    catalog = get_pricing_catalog()
+    if not catalog.has_drawer_inputs(wood_stock_id, bottom_id):
+        catalog = reload_if_settings_changed(catalog)
+    return catalog
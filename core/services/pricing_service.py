@@ -0,0 +1,209 @@
+"""
+Batch pricing for door, drawer and generic line items.
+
+price_line_items() prices an arbitrary list of line-item specs in one pass
+against a single pricing catalog load. Specs use the session format stored
+in request.session['current_order']['items'] (related rows may be given as
+{'id': ..., 'name': ...} dicts, model instances or raw ids); model instances
+are converted with spec_from_line_item().
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Union
+
+from .pricing_catalog import (
+    PricingCatalog, DoorPriceBreakdown, DrawerPriceBreakdown,
+    get_pricing_catalog, reload_if_settings_changed,
+)
+
+TWO_PLACES = Decimal('0.01')
+
+
+@dataclass(frozen=True)
+class LineItemPrice:
+    """Priced line item. ``breakdown`` is None for generic and custom-priced items."""
+    type: str
+    quantity: int
+    unit_price: Decimal
+    total_price: Decimal
+    custom_price: bool
+    breakdown: Optional[Union[DoorPriceBreakdown, DrawerPriceBreakdown]] = None
+
+
+def _ref_id(value):
+    """Return the primary key from a session {'id': ...} dict, model instance or raw id."""
+    if value is None or value == '':
+        return None
+    if isinstance(value, dict):
+        return value.get('id')
+    if hasattr(value, 'pk'):
+        return value.pk
+    return value
+
+
+def _decimal(value, default='0') -> Decimal:
+    if value is None or value == '':
+        return Decimal(default)
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def _flag(value) -> bool:
+    if isinstance(value, str):
+        return value.lower() in ('1', 'true', 'on', 'yes')
+    return bool(value)
+
+
+def spec_from_line_item(item) -> Dict[str, Any]:
+    """Convert a DoorLineItem, DrawerLineItem or GenericLineItem into a pricing spec."""
+    spec = {
+        'type': item.type,
+        'quantity': item.quantity,
+        'price_per_unit': item.price_per_unit,
+        'custom_price': item.custom_price,
+    }
+    if item.type == 'door':
+        spec.update({
+            'wood_stock': item.wood_stock_id,
+            'style': item.style_id,
+            'panel_rise': item.panel_rise_id,
+            'width': item.width,
+            'height': item.height,
+        })
+    elif item.type == 'drawer':
+        spec.update({
+            'wood_stock': item.wood_stock_id,
+            'bottom': item.bottom_id,
+            'width': item.width,
+            'height': item.height,
+            'depth': item.depth,
+            'undermount': item.undermount,
+            'finishing': item.finishing,
+        })
+    return spec
+
+
+def _door_args(spec: Dict[str, Any]):
+    return (
+        _ref_id(spec.get('wood_stock')),
+        _ref_id(spec.get('style')),
+        _ref_id(spec.get('panel_rise')),
+        _decimal(spec.get('width')),
+        _decimal(spec.get('height')),
+    )
+
+
+def _drawer_args(spec: Dict[str, Any]):
+    return (
+        _ref_id(spec.get('wood_stock')),
+        _ref_id(spec.get('bottom')),
+        _decimal(spec.get('width')),
+        _decimal(spec.get('height')),
+        _decimal(spec.get('depth')),
+        _flag(spec.get('undermount', False)),
+        _flag(spec.get('finishing', False)),
+    )
+
+
+def _price_spec(catalog: PricingCatalog, spec: Dict[str, Any]) -> LineItemPrice:
+    item_type = spec.get('type', 'other')
+    quantity = int(spec.get('quantity') or 1)
+    custom_price = _flag(spec.get('custom_price', False))
+    breakdown = None
+
+    if custom_price or item_type not in ('door', 'drawer'):
+        unit_price = _decimal(spec.get('price_per_unit'), '0.00')
+    elif item_type == 'door':
+        breakdown = catalog.price_door(*_door_args(spec))
+        unit_price = breakdown.unit_price
+    else:
+        breakdown = catalog.price_drawer(*_drawer_args(spec))
+        unit_price = breakdown.unit_price
+
+    return LineItemPrice(
+        type=item_type,
+        quantity=quantity,
+        unit_price=unit_price,
+        total_price=(unit_price * quantity).quantize(TWO_PLACES),
+        custom_price=custom_price,
+        breakdown=breakdown,
+    )
+
+
+def _catalog_covers(catalog: PricingCatalog, specs: List[Dict[str, Any]]) -> bool:
+    for spec in specs:
+        if _flag(spec.get('custom_price', False)):
+            continue
+        if spec.get('type') == 'door':
+            if not catalog.has_door_inputs(_ref_id(spec.get('wood_stock')), _ref_id(spec.get('style')),
+                                           _ref_id(spec.get('panel_rise'))):
+                return False
+        elif spec.get('type') == 'drawer':
+            if not catalog.has_drawer_inputs(_ref_id(spec.get('wood_stock')), _ref_id(spec.get('bottom'))):
+                return False
+    return True
+
+
+def get_catalog_for_specs(specs: List[Dict[str, Any]]) -> PricingCatalog:
+    """Return a catalog containing every settings row the specs refer to.
+
+    Like get_catalog_for_door(), a miss reloads it only if the settings changed.
+    """
+    catalog = get_pricing_catalog()
+    if not _catalog_covers(catalog, specs):
+        catalog = reload_if_settings_changed(catalog)
+    return catalog
+
+
+def price_line_items(specs: Iterable[Dict[str, Any]],
+                     catalog: Optional[PricingCatalog] = None) -> List[LineItemPrice]:
+    """Price a list of line-item specs in one pass.
+
+    Returns one LineItemPrice per spec, in order. Custom-priced and generic
+    items keep their stored ``price_per_unit``. Unknown settings rows raise
+    the matching model's DoesNotExist.
+    """
+    specs = list(specs)
+    if catalog is None:
+        catalog = get_catalog_for_specs(specs)
+    return [_price_spec(catalog, spec) for spec in specs]
+
+
+class PriceCache:
+    """Bounded, thread-safe LRU cache for price previews.
+
+    Keys must include the pricing catalog version so that entries priced
+    against old settings are never served; they simply age out.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            try:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            except KeyError:
+                pass
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Shared by the calculate_door_price / calculate_drawer_price preview endpoints
+price_preview_cache = PriceCache()
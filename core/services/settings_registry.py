@@ -0,0 +1,61 @@
+"""
+Process-wide cache of the single-row settings tables.
+
+RailDefaults, MiscellaneousDoorSettings and DefaultDrawerSettings each hold
+one row that is read on every door form, customer defaults lookup and door
+line item built by OrderService. The registry loads each row once and
+shares it between waitress's worker threads; the settings views call
+invalidate_settings() after saving one. The cached instances are shared,
+so callers must treat them as read-only. MiscellaneousDoorSettings is
+cached with its drawer front and slab panel types, so saving a panel type
+invalidates it too.
+
+An empty table is not cached, so a row created by the seed commands or the
+settings views is picked up on the next lookup.
+"""
+import threading
+from typing import Dict, Optional
+
+from ..models.door import RailDefaults, MiscellaneousDoorSettings
+from ..models.drawer import DefaultDrawerSettings
+
+_rows_lock = threading.Lock()
+_rows: Dict[type, object] = {}
+
+
+def get_singleton(model, *related):
+    """Return ``model.objects.first()``, loading it once per process.
+
+    ``related`` names foreign keys to load with the row via select_related().
+    """
+    row = _rows.get(model)
+    if row is not None:
+        return row
+    with _rows_lock:
+        row = _rows.get(model)
+        if row is None:
+            row = model.objects.select_related(*related).first()
+            if row is not None:
+                _rows[model] = row
+        return row
+
+
+def invalidate_settings(*models):
+    """Drop the cached rows of ``models``, or of every table if none are given."""
+    with _rows_lock:
+        if not models:
+            _rows.clear()
+        for model in models:
+            _rows.pop(model, None)
+
+
+def get_rail_defaults() -> Optional[RailDefaults]:
+    return get_singleton(RailDefaults)
+
+
+def get_misc_door_settings() -> Optional[MiscellaneousDoorSettings]:
+    return get_singleton(MiscellaneousDoorSettings, 'drawer_front', 'drawer_slab')
+
+
+def get_drawer_settings() -> Optional[DefaultDrawerSettings]:
+    return get_singleton(DefaultDrawerSettings)
@@ -1 +1,332 @@
-# Create your tests here.
+import re
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from urllib.parse import urlencode
+
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import (
+    Customer, CustomerDefaults, Order, WoodStock, Style, EdgeProfile, PanelRise,
+    DoorLineItem, DrawerLineItem, GenericLineItem, DrawerWoodStock, DrawerBottomSize,
+)
+from .services.order_service import OrderConflictError, OrderService
+from .services.pricing_catalog import bump_catalog_version, get_catalog_for_door, get_pricing_catalog
+from .services.settings_registry import invalidate_settings
+from .views.door import calculate_door_price
+
+
+class OrderTestCase(TestCase):
+    """Pricing settings from the populate commands and a customer with a percentage discount."""
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command('populate_door_settings', stdout=StringIO())
+        call_command('populate_drawer_settings', stdout=StringIO())
+        bump_catalog_version()
+        invalidate_settings()
+        cls.customer = Customer.objects.create(
+            company_name='Test Cabinets', taxable=True, tax_percentage=Decimal('7.00'),
+            address_line1='1 Main St',
+        )
+        CustomerDefaults.objects.create(
+            customer=cls.customer, discount_type='PERCENT', discount_value=Decimal('10.00'),
+        )
+        # Read back as Decimals, as the views load it
+        cls.customer = Customer.objects.get(pk=cls.customer.pk)
+
+    def door(self, width='12.000', height='30.000', quantity=1):
+        return {
+            'type': 'door',
+            'wood_stock': {'id': WoodStock.objects.first().pk},
+            'edge_profile': {'id': EdgeProfile.objects.first().pk},
+            'panel_rise': {'id': PanelRise.objects.first().pk},
+            'style': {'id': Style.objects.first().pk},
+            'width': width,
+            'height': height,
+            'quantity': str(quantity),
+            'price_per_unit': '0.00',
+            'custom_price': False,
+        }
+
+    def drawer(self, quantity=1):
+        return {
+            'type': 'drawer',
+            'wood_stock': {'id': DrawerWoodStock.objects.first().pk},
+            'bottom': {'id': DrawerBottomSize.objects.first().pk},
+            'width': '15.000',
+            'height': '6.000',
+            'depth': '18.000',
+            'quantity': str(quantity),
+            'undermount': True,
+            'finishing': False,
+            'price_per_unit': '0.00',
+            'custom_price': False,
+        }
+
+    def generic(self, name='Hinges', price='4.50', quantity=2):
+        return {
+            'type': 'other',
+            'name': name,
+            'quantity': str(quantity),
+            'price_per_unit': price,
+            'custom_price': True,
+        }
+
+    def form_data(self, **extra):
+        return {
+            'customer': self.customer,
+            'billing_address1': '1 Main St',
+            'order_date': date(2026, 1, 15),
+            'notes': '',
+            **extra,
+        }
+
+    def session_data(self, items):
+        return {'customer': str(self.customer.pk), 'billing_address1': '1 Main St', 'items': items}
+
+    def create(self, items, is_quote=True):
+        success, order, error = OrderService.create_from_session(
+            self.form_data(), self.session_data(items), is_quote=is_quote)
+        self.assertTrue(success, error)
+        return Order.objects.get(pk=order.pk)
+
+    def request(self, method, data=None, session=None, **headers):
+        """
+        A request for calling a view directly, with a session and messages.
+        DELETE data goes in the query string, as htmx sends it.
+        """
+        if method == 'delete':
+            request = RequestFactory().delete('/?' + urlencode(data or {}), **headers)
+        else:
+            request = getattr(RequestFactory(), method)('/', data or {}, **headers)
+        request.session = SessionStore()
+        request.session.update(session or {})
+        request._messages = FallbackStorage(request)
+        return request
+
+    def assertTotalsMatchRecount(self, order):
+        """The stored summary matches a recount, and the stored totals match deriving them again."""
+        order = Order.objects.get(pk=order.pk)
+        self.assertEqual(order.check_totals(), {})
+        recalculated = Order.objects.get(pk=order.pk)
+        recalculated.calculate_totals()
+        for field in ('discount_amount', 'surcharge_amount', 'shipping_amount', 'tax_amount', 'total'):
+            self.assertEqual(getattr(order, field), getattr(recalculated, field), field)
+
+
+class OrderTotalsTests(OrderTestCase):
+    def test_incremental_totals_match_full_recount(self):
+        order = self.create([self.door(), self.door(width='15.500', quantity=2), self.drawer(), self.generic()])
+        self.assertEqual((order.door_count, order.drawer_count, order.misc_count), (2, 1, 1))
+        self.assertTotalsMatchRecount(order)
+
+        # Save an edit as a diff: change a door, drop the drawer, add a door
+        session = OrderService.serialize_to_session(order)
+        items = [item for item in session['items'] if item['type'] != 'drawer']
+        items[0]['quantity'] = '3'
+        items.append(self.door(width='20.250', height='40.000'))
+        session['items'] = items
+        success, _, error = OrderService.update_from_session(
+            order, self.form_data(version=order.version), session)
+        self.assertTrue(success, error)
+        order = Order.objects.get(pk=order.pk)
+        self.assertEqual((order.door_count, order.drawer_count, order.misc_count), (3, 0, 1))
+        self.assertTotalsMatchRecount(order)
+
+        door_id = order.door_items.first().pk
+        self.assertTrue(OrderService.remove_line_item(order, door_id, order.version))
+        order = Order.objects.get(pk=order.pk)
+        self.assertEqual(order.door_count, 2)
+        self.assertTotalsMatchRecount(order)
+
+    def test_check_totals_reports_drifted_summary_only(self):
+        order = self.create([self.door(), self.drawer()], is_quote=False)
+        Order.objects.filter(pk=order.pk).update(door_count=5, item_total=Decimal('1.00'))
+        # A changed customer discount is not drift: saved orders keep their totals
+        CustomerDefaults.objects.filter(customer=self.customer).update(discount_value=Decimal('25.00'))
+        drift = Order.objects.get(pk=order.pk).check_totals()
+        self.assertEqual(set(drift), {'door_count', 'item_total'})
+        self.assertEqual(drift['door_count'], (5, 1))
+
+
+class OrderVersionTests(OrderTestCase):
+    def test_edit_from_an_older_version_is_rejected(self):
+        order = self.create([self.door()])
+        opened_at = order.version
+        session = OrderService.serialize_to_session(order)
+        success, _, error = OrderService.update_from_session(
+            Order.objects.get(pk=order.pk), self.form_data(version=opened_at), session)
+        self.assertTrue(success, error)
+
+        with self.assertRaises(OrderConflictError):
+            OrderService.update_from_session(
+                Order.objects.get(pk=order.pk), self.form_data(version=opened_at, notes='Late edit'), session)
+        self.assertEqual(Order.objects.get(pk=order.pk).notes, '')
+
+    def test_save_after_removing_a_saved_item_uses_the_swapped_version(self):
+        from .views.order import remove_line_item
+        order = self.create([self.door(), self.door(width='16.000')])
+        door_id = order.door_items.first().pk
+
+        response = remove_line_item(
+            self.request('delete', {'version': order.version}, session={'order_id': order.pk}), door_id)
+        self.assertEqual(response.status_code, 200)
+        match = re.search(r'<input[^>]*name="version" value="(\d+)" id="id_version" hx-swap-oob="true"',
+                          response.content.decode())
+        self.assertIsNotNone(match)
+        page_version = int(match.group(1))
+        self.assertEqual(page_version, Order.objects.get(pk=order.pk).version)
+
+        order = Order.objects.get(pk=order.pk)
+        success, _, error = OrderService.update_from_session(
+            order, self.form_data(version=page_version), OrderService.serialize_to_session(order))
+        self.assertTrue(success, error)
+        self.assertTotalsMatchRecount(order)
+
+    def test_remove_with_an_older_version_is_rejected(self):
+        from .views.order import remove_line_item
+        order = self.create([self.door(), self.door(width='16.000')])
+        Order.objects.filter(pk=order.pk).update(version=order.version + 1)
+
+        response = remove_line_item(
+            self.request('delete', {'version': order.version}, session={'order_id': order.pk}),
+            order.door_items.first().pk)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Order.objects.get(pk=order.pk).door_count, 2)
+
+    def test_reprice_checks_the_page_version(self):
+        from .views.order import reprice_order
+        order = self.create([self.door()])
+
+        response = reprice_order(
+            self.request('post', {'version': order.version - 1}, HTTP_HX_REQUEST='true'), order.pk)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Order.objects.get(pk=order.pk).version, order.version)
+
+        response = reprice_order(self.request('post', {'version': order.version}), order.pk)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Order.objects.get(pk=order.pk).version, order.version + 1)
+
+
+class OrderDuplicationTests(OrderTestCase):
+    def test_duplicate_copies_line_items_as_new_rows(self):
+        order = self.create([self.door(), self.door(width='18.000', quantity=4), self.drawer(), self.generic()],
+                            is_quote=False)
+        long_ago = timezone.now() - timezone.timedelta(days=200)
+        for model in (DoorLineItem, DrawerLineItem, GenericLineItem):
+            model.objects.filter(order=order).update(created_at=long_ago, updated_at=long_ago)
+        started = timezone.now()
+
+        success, duplicate, error = OrderService.duplicate_order(order, as_quote=True)
+        self.assertTrue(success, error)
+        duplicate = Order.objects.get(pk=duplicate.pk)
+        self.assertTrue(duplicate.is_quote)
+        self.assertNotEqual(duplicate.order_number, order.order_number)
+        self.assertEqual(duplicate.order_date, timezone.localdate())
+        self.assertEqual((duplicate.door_count, duplicate.drawer_count, duplicate.misc_count), (2, 1, 1))
+        self.assertEqual(duplicate.item_total, order.item_total)
+        self.assertTotalsMatchRecount(duplicate)
+
+        copies = duplicate.line_items
+        self.assertEqual(sorted(item.price_per_unit for item in copies),
+                         sorted(item.price_per_unit for item in order.line_items))
+        for item in copies:
+            self.assertGreaterEqual(item.created_at, started)
+            self.assertGreaterEqual(item.updated_at, started)
+        # The source keeps its own rows
+        self.assertEqual(Order.objects.get(pk=order.pk).line_items[0].created_at, long_ago)
+
+    def test_duplicate_with_reprice(self):
+        order = self.create([self.door(), self.drawer()])
+        DoorLineItem.objects.filter(order=order).update(price_per_unit=Decimal('1.00'))
+        order.calculate_totals()
+        order.save()
+
+        success, duplicate, error = OrderService.duplicate_order(order, as_quote=False, reprice=True)
+        self.assertTrue(success, error)
+        duplicate = Order.objects.get(pk=duplicate.pk)
+        self.assertFalse(duplicate.is_quote)
+        self.assertNotEqual(duplicate.door_items.get().price_per_unit, Decimal('1.00'))
+        self.assertTotalsMatchRecount(duplicate)
+
+
+class BulkQuoteActionTests(OrderTestCase):
+    def setUp(self):
+        self.quotes = [self.create([self.door(), self.generic()]) for _ in range(3)]
+        self.order = self.create([self.door()], is_quote=False)
+
+    def post(self, action, orders):
+        from .views.quote import bulk_quote_action
+        return bulk_quote_action(self.request(
+            'post', {'action': action, 'quote_ids': [order.pk for order in orders]}, HTTP_HX_REQUEST='true'))
+
+    def test_convert_selected_quotes(self):
+        response = self.post('convert', [*self.quotes[:2], self.order])
+        self.assertEqual(response['HX-Redirect'], reverse('quotes'))
+        converted = Order.objects.filter(pk__in=[quote.pk for quote in self.quotes[:2]])
+        self.assertFalse(converted.filter(is_quote=True).exists())
+        for quote in converted:
+            self.assertEqual(quote.version, self.quotes[0].version + 1)
+        self.assertTrue(Order.objects.get(pk=self.quotes[2].pk).is_quote)
+        # Confirmed orders are left alone
+        self.assertEqual(Order.objects.get(pk=self.order.pk).version, self.order.version)
+
+    def test_delete_selected_quotes_in_chunks(self):
+        self.assertEqual(OrderService.delete_quotes([quote.pk for quote in self.quotes] + [self.order.pk],
+                                                    chunk_size=2), 3)
+        self.assertEqual(list(Order.objects.values_list('pk', flat=True)), [self.order.pk])
+        self.assertFalse(DoorLineItem.objects.exclude(order=self.order).exists())
+        self.assertFalse(GenericLineItem.objects.exists())
+
+    def test_delete_through_the_view(self):
+        self.post('delete', self.quotes[:1])
+        self.assertFalse(Order.objects.filter(pk=self.quotes[0].pk).exists())
+        self.assertEqual(Order.objects.count(), 3)
+
+    def test_unknown_action_and_empty_selection(self):
+        self.assertEqual(self.post('archive', self.quotes).status_code, 400)
+        self.post('delete', [])
+        self.assertEqual(Order.objects.count(), 4)
+
+
+class PricePreviewTests(OrderTestCase):
+    def setUp(self):
+        bump_catalog_version()
+
+    def preview(self, wood_stock_id, **headers):
+        query = {
+            'wood_stock': wood_stock_id, 'style': Style.objects.first().pk,
+            'width': '12.000', 'height': '30.000',
+        }
+        return calculate_door_price(RequestFactory().get('/', query, **headers))
+
+    def test_only_priced_previews_carry_an_etag(self):
+        response = self.preview(WoodStock.objects.first().pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header('ETag'))
+        self.assertEqual(
+            self.preview(WoodStock.objects.first().pk, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+        response = self.preview(99999)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_unknown_ids_reload_the_catalog_only_after_a_settings_change(self):
+        catalog = get_pricing_catalog()
+        style_id = Style.objects.first().pk
+        self.assertIs(get_catalog_for_door(99999, style_id), catalog)
+        self.assertIs(get_pricing_catalog(), catalog)
+
+        # Written without bumping the catalog, as a seed script would
+        wood = WoodStock.objects.create(
+            name='Sapele', raised_panel_price=Decimal('9.00'), flat_panel_price=Decimal('8.00'))
+        reloaded = get_catalog_for_door(wood.pk, style_id)
+        self.assertIsNot(reloaded, catalog)
+        self.assertTrue(reloaded.has_door_inputs(wood.pk, style_id))
+        self.assertIs(get_catalog_for_door(99999, style_id), reloaded)
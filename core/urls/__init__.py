@@ -1,10 +1,12 @@
 from django.urls import path, include
 from django.views.generic.base import RedirectView
 from ..views import home
+from ..views.common import pricing_table
 
 urlpatterns = [
     path('', RedirectView.as_view(url='orders/')),
     path('home/', home, name='home'),
+    path('pricing/table/', pricing_table, name='pricing_table'),
     path('customers/', include('core.urls.customer')),
     path('orders/', include('core.urls.order')),
     path('quotes/', include('core.urls.quote')),
@@ -1,7 +1,7 @@
 from django.urls import path
 from ..views.order import (
-    orders, edit_order, create_order, delete_order, convert_to_order,
-    get_customer_details, order_search, remove_line_item, confirm_remove_line_item,
+    orders, edit_order, create_order, delete_order, convert_to_order, reprice_order, duplicate_order,
+    get_customer_details, order_search, remove_line_item, confirm_remove_line_item, reprice_line_items,
     get_line_item, generate_order_pdf, print_modal, print_documents
 )
 
@@ -11,11 +11,14 @@ urlpatterns = [
     path('<int:order_id>/', edit_order, name='edit_order'),
     path('<int:order_id>/delete/', delete_order, name='delete_order'),
     path('<int:order_id>/convert/', convert_to_order, name='convert_to_order'),
+    path('<int:order_id>/reprice/', reprice_order, name='reprice_order'),
+    path('<int:order_id>/duplicate/', duplicate_order, name='duplicate_order'),
     path('<int:order_id>/pdf/', generate_order_pdf, name='order_pdf'),
     path('<int:order_id>/print-modal/', print_modal, name='print_modal'),
     path('<int:order_id>/print/', print_documents, name='print_documents'),
     path('get-customer-address/', get_customer_details, name='get_customer_address'),
     path('search/', order_search, name='order_search'),
+    path('items/reprice/', reprice_line_items, name='reprice_line_items'),
     path('items/<int:item_id>/data/', get_line_item, name='get_line_item'),
     path('items/<int:item_id>/remove/', remove_line_item, name='remove_line_item'),
     path('items/<int:item_id>/confirm-remove/', confirm_remove_line_item, name='confirm_remove_line_item'),
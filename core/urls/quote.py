@@ -1,7 +1,8 @@
 from django.urls import path
-from ..views.quote import quotes, quote_search
+from ..views.quote import quotes, quote_search, bulk_quote_action
 
 urlpatterns = [
     path('', quotes, name='quotes'),
     path('search/', quote_search, name='quote_search'),
+    path('bulk/', bulk_quote_action, name='bulk_quote_action'),
 ]
@@ -23,12 +23,15 @@ from ..views.settings import (
     edit_drawer_dim_surcharge, get_drawer_dim_surcharge, update_drawer_dim_surcharge,
     show_drawer_dim_surcharge_add, add_drawer_dim_surcharge, delete_drawer_dim_surcharge, confirm_delete_drawer_dim_surcharge,
     edit_drawer_defaults, get_drawer_defaults, update_drawer_defaults,
-    edit_misc_settings, get_misc_settings, update_misc_settings
+    edit_misc_settings, get_misc_settings, update_misc_settings,
+    pricing_simulator, price_sheet
 )
 
 urlpatterns = [
     path('doors/', door_settings, name='door_settings'),
     path('drawers/', drawer_settings, name='drawer_settings'),
+    path('pricing-simulator/', pricing_simulator, name='pricing_simulator'),
+    path('price-lists/', price_sheet, name='price_sheet'),
 
     # Door Style
     path('doors/styles/<int:style_id>/edit/', edit_door_style, name='edit_door_style'),
@@ -2,7 +2,14 @@
 Common view functions for order and quote listings and search functionality.
 """
 
+import hashlib
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.http import JsonResponse
 from django.shortcuts import render
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_http_methods, condition
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from decimal import Decimal, InvalidOperation
 
@@ -298,17 +305,7 @@ def process_line_item_form(request, form_class, model_class, item_type, transfor
         
         # Add or replace the item in the session order
         try:
-            edit_index = request.POST.get('edit_index')
-            if edit_index is not None and edit_index != '':
-                idx = int(edit_index)
-                items = request.session['current_order']['items']
-                if 0 <= idx < len(items):
-                    items[idx] = session_item
-                else:
-                    items.append(session_item)
-            else:
-                request.session['current_order']['items'].append(session_item)
-            request.session.modified = True
+            place_session_item(request, session_item)
         except Exception as e:
             # Return form with error message for session update issues
             return render_form_with_errors(request, form, item_type, f'Error saving item to order: {str(e)}')
@@ -326,6 +323,28 @@ def process_line_item_form(request, form_class, model_class, item_type, transfor
         return render_form_with_errors(request, form, item_type, str(e))
 
 
+def place_session_item(request, session_item):
+    """
+    Append a line item to the session order, or replace the one at the
+    posted edit_index. A replaced item loaded from a saved order passes its
+    'id' on, so saving the order updates that row instead of replacing it.
+    """
+    items = request.session['current_order']['items']
+    edit_index = request.POST.get('edit_index')
+    if edit_index is not None and edit_index != '':
+        idx = int(edit_index)
+        if 0 <= idx < len(items):
+            previous = items[idx]
+            if previous.get('id') and previous.get('type') == session_item.get('type'):
+                session_item['id'] = previous['id']
+            items[idx] = session_item
+        else:
+            items.append(session_item)
+    else:
+        items.append(session_item)
+    request.session.modified = True
+
+
 def get_current_customer(request):
     """
     Get the current customer from the session.
@@ -341,3 +360,74 @@ def get_current_customer(request):
     return None
 
 
+def price_preview_etag(parse_query, has_inputs):
+    """
+    Build the ETag function for a price preview endpoint. Its response
+    depends only on the query string and the pricing catalog version, so
+    identical previews are answered with 304 Not Modified until a pricing
+    setting changes.
+
+    Args:
+        parse_query: The endpoint's query parser, returning None for missing
+            fields and raising for values that do not parse
+        has_inputs: Called with the catalog and the parsed spec; False when
+            the catalog lacks a row the spec refers to
+
+    Requests that fail either check get no ETag, so they are never answered
+    with 304.
+    """
+    def etag(request):
+        from ..services.pricing_catalog import get_pricing_catalog
+        try:
+            parsed = parse_query(request.GET)
+        except (ValueError, TypeError, ArithmeticError):
+            return None
+        catalog = get_pricing_catalog()
+        if parsed is None or not has_inputs(catalog, parsed[0]):
+            return None
+        query = urlencode(sorted(request.GET.items()))
+        digest = hashlib.sha1(f"{request.path}?{query}".encode()).hexdigest()[:16]
+        return f"{catalog.version}-{digest}"
+    return etag
+
+
+def price_preview_condition(parse_query, has_inputs):
+    """
+    condition() for a price preview endpoint (see price_preview_etag). The
+    ETag is only kept on 200 responses, so errors are never revalidated.
+    """
+    conditional = condition(etag_func=price_preview_etag(parse_query, has_inputs))
+
+    def decorator(view):
+        conditional_view = conditional(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if response.status_code not in (200, 304):
+                del response['ETag']
+            return response
+        return wrapper
+    return decorator
+
+
+def pricing_table_etag(request):
+    """ETag for the pricing table: the pricing catalog version it was built from."""
+    from ..services.pricing_catalog import get_pricing_catalog
+    return get_pricing_catalog().version
+
+
+@require_http_methods(["GET"])
+@condition(etag_func=pricing_table_etag)
+def pricing_table(request):
+    """
+    Return the door and drawer pricing inputs as fixed-point integers so the
+    door and drawer forms can preview prices without a request per keystroke.
+    Clients revalidate with the ETag and get 304 until a pricing setting
+    changes. Prices are still recalculated on the server when items are added.
+    """
+    from ..services.pricing_catalog import get_pricing_catalog
+    from ..services.fixed_point import get_fixed_point_kernel
+    response = JsonResponse(get_fixed_point_kernel(get_pricing_catalog()).as_table())
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -74,6 +74,12 @@ def edit_customer(request, customer_id):
 
             customer.save(update_fields=['door_defaults', 'drawer_defaults'])
             messages.success(request, 'Customer updated successfully!')
+
+            if form.cleaned_data.get('update_open_quotes') and set(form.changed_data) & set(CustomerForm.TOTALS_FIELDS):
+                from ..services.order_service import OrderService
+                updated = OrderService.recalculate_customer_quotes(customer)
+                if updated:
+                    messages.info(request, f"Recalculated the totals of {updated} open quote{'s' if updated != 1 else ''}.")
             return redirect('customers')
     else:
         form = CustomerForm(instance=customer)
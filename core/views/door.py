@@ -1,12 +1,15 @@
 from decimal import Decimal
 from django.http import JsonResponse
 from django.shortcuts import render
+from django.utils.cache import patch_cache_control
 from django.views.decorators.http import require_http_methods
 from ..forms import DoorForm
-from ..models.door import DoorLineItem, WoodStock, Style, PanelRise
-from .common import process_line_item_form, get_current_customer
+from ..models.door import DoorLineItem
+from .common import process_line_item_form, get_current_customer, price_preview_condition
 from ..models import Customer
 from ..services.door_defaults_service import DoorDefaultsService
+from ..services.pricing_catalog import get_catalog_for_door
+from ..services.pricing_service import price_preview_cache
 
 @require_http_methods(["GET", "POST"])
 def door_form(request):
@@ -84,40 +87,62 @@ def add_door(request):
         transform_door_data
     )
 
+def _parse_door_price_query(params):
+    """
+    Read a door price preview query.
+
+    Returns:
+        tuple: The (wood_stock_id, style_id, panel_rise_id, width, height)
+            spec and the quantity, or None if a required field is missing
+    """
+    wood_stock_id = params.get('wood_stock')
+    style_id = params.get('style')
+    panel_rise_id = params.get('panel_rise')
+    width = params.get('width')
+    height = params.get('height')
+    quantity = params.get('quantity', '1')
+
+    if not all([wood_stock_id, style_id, width, height]):
+        return None
+
+    spec = (
+        int(wood_stock_id),
+        int(style_id),
+        int(panel_rise_id) if panel_rise_id else None,
+        Decimal(width),
+        Decimal(height),
+    )
+    return spec, int(quantity)
+
+
 @require_http_methods(["GET"])
+@price_preview_condition(_parse_door_price_query,
+                         lambda catalog, spec: catalog.has_door_inputs(*spec[:3]))
 def calculate_door_price(request):
-    """Return calculated price breakdown for a door given current form values."""
+    """Return calculated price breakdown for a door given current form values.
+
+    Prices are memoized per pricing catalog version and the response carries
+    an ETag, so repeated previews come from the cache or return 304.
+    """
     try:
-        wood_stock_id = request.GET.get('wood_stock')
-        style_id = request.GET.get('style')
-        panel_rise_id = request.GET.get('panel_rise')
-        width = request.GET.get('width')
-        height = request.GET.get('height')
-        quantity = request.GET.get('quantity', '1')
-
-        if not all([wood_stock_id, style_id, width, height]):
+        parsed = _parse_door_price_query(request.GET)
+        if parsed is None:
             return JsonResponse({'error': 'Missing required fields'}, status=400)
 
-        wood_stock = WoodStock.objects.get(pk=wood_stock_id)
-        style = Style.objects.get(pk=style_id)
-        panel_rise = PanelRise.objects.get(pk=panel_rise_id) if panel_rise_id else None
-
-        item = DoorLineItem(
-            wood_stock=wood_stock,
-            style=style,
-            panel_rise=panel_rise,
-            width=Decimal(width),
-            height=Decimal(height),
-            quantity=int(quantity),
+        spec, qty = parsed
+        catalog = get_catalog_for_door(*spec[:3])
+        price_per_unit = price_preview_cache.get_or_compute(
+            (catalog.version, 'door') + spec,
+            lambda: catalog.door_unit_price(*spec),
         )
-        price_per_unit = item.calculate_price()
-        qty = int(quantity)
         total = (price_per_unit * qty).quantize(Decimal('0.01'))
 
-        return JsonResponse({
+        response = JsonResponse({
             'price_per_unit': str(price_per_unit),
             'total': str(total),
         })
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=400)
 
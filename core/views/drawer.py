@@ -1,15 +1,16 @@
 from decimal import Decimal
-from django.db.models import Q
 from django.http import JsonResponse
 from django.shortcuts import render
+from django.utils.cache import patch_cache_control
 from django.views.decorators.http import require_http_methods
 from ..models.drawer import (
     DrawerLineItem, DrawerWoodStock, DrawerBottomSize,
-    DrawerPricing, DrawerDimensionSurcharge, DefaultDrawerSettings,
 )
 from ..forms import DrawerForm
-from .common import process_line_item_form
+from .common import process_line_item_form, price_preview_condition
 from .door import get_current_customer
+from ..services.pricing_catalog import get_catalog_for_drawer
+from ..services.pricing_service import price_preview_cache
 
 def drawer_form(request):
     """Render the drawer form partial template."""
@@ -91,59 +92,77 @@ def add_drawer(request):
     )
 
 
+def _parse_drawer_price_query(params):
+    """
+    Read a drawer price preview query.
+
+    Returns:
+        tuple: The (wood_stock_id, bottom_id, width, height, depth,
+            undermount, finishing) spec and the quantity, or None if a
+            required field is missing
+    """
+    wood_stock_id = params.get('wood_stock')
+    bottom_id = params.get('bottom')
+    width = params.get('width')
+    height = params.get('height')
+    depth = params.get('depth')
+    undermount = params.get('undermount', '0') == '1'
+    finishing = params.get('finishing', '0') == '1'
+    quantity = params.get('quantity', '1')
+
+    if not all([wood_stock_id, bottom_id, width, height, depth]):
+        return None
+
+    spec = (
+        int(wood_stock_id),
+        int(bottom_id),
+        Decimal(width),
+        Decimal(height),
+        Decimal(depth),
+        undermount,
+        finishing,
+    )
+    return spec, int(quantity)
+
+
 @require_http_methods(["GET"])
+@price_preview_condition(_parse_drawer_price_query,
+                         lambda catalog, spec: catalog.has_drawer_inputs(*spec[:2]))
 def calculate_drawer_price(request):
     """Return calculated price breakdown for a drawer given current form values.
     
-    Returns base_price (before surcharge), surcharge_percent, price_per_unit, and total.
+    Returns base_price (before surcharge), the tier, wood stock, bottom and
+    option charges it is made of, surcharge_percent, price_per_unit, and total.
+    The breakdown comes from PricingCatalog.price_drawer, the same engine
+    DrawerLineItem prices with. Prices are memoized per pricing catalog
+    version and the response carries an ETag, so repeated previews come from
+    the cache or return 304.
     """
     try:
-        wood_stock_id = request.GET.get('wood_stock')
-        bottom_id = request.GET.get('bottom')
-        width = request.GET.get('width')
-        height = request.GET.get('height')
-        depth = request.GET.get('depth')
-        undermount = request.GET.get('undermount', '0') == '1'
-        finishing = request.GET.get('finishing', '0') == '1'
-        quantity = request.GET.get('quantity', '1')
-
-        if not all([wood_stock_id, bottom_id, width, height, depth]):
+        parsed = _parse_drawer_price_query(request.GET)
+        if parsed is None:
             return JsonResponse({'error': 'Missing required fields'}, status=400)
 
-        wood_stock = DrawerWoodStock.objects.get(pk=wood_stock_id)
-        bottom = DrawerBottomSize.objects.get(pk=bottom_id)
-        w = Decimal(width)
-        h = Decimal(height)
-        d = Decimal(depth)
-
-        tier = DrawerPricing.objects.filter(height__gte=h).order_by('height').first()
-        if tier is None:
-            tier = DrawerPricing.objects.order_by('-height').first()
-        tier_price = tier.price if tier else Decimal('0.00')
-
-        base_price = tier_price + wood_stock.price + bottom.price
-
-        default_settings = DefaultDrawerSettings.objects.first()
-        if default_settings:
-            if undermount:
-                base_price += default_settings.undermount_charge
-            if finishing:
-                base_price += default_settings.finish_charge
-
-        matching = DrawerDimensionSurcharge.objects.filter(
-            Q(width__gt=0, width__lte=w) | Q(depth__gt=0, depth__lte=d)
-        ).order_by('-surcharge_percent').first()
-
-        surcharge_percent = matching.surcharge_percent if matching else Decimal('0.00')
-        price_per_unit = (base_price * (1 + surcharge_percent / Decimal('100'))).quantize(Decimal('0.01'))
-        qty = int(quantity)
-        total = (price_per_unit * qty).quantize(Decimal('0.01'))
+        spec, qty = parsed
+        catalog = get_catalog_for_drawer(*spec[:2])
+        breakdown = price_preview_cache.get_or_compute(
+            (catalog.version, 'drawer') + spec,
+            lambda: catalog.price_drawer(*spec),
+        )
+        total = (breakdown.unit_price * qty).quantize(Decimal('0.01'))
 
-        return JsonResponse({
-            'base_price': str(base_price.quantize(Decimal('0.01'))),
-            'surcharge_percent': str(surcharge_percent),
-            'price_per_unit': str(price_per_unit),
+        response = JsonResponse({
+            'base_price': str(breakdown.base_price.quantize(Decimal('0.01'))),
+            'tier_price': str(breakdown.tier_price),
+            'wood_stock_price': str(breakdown.wood_stock_price),
+            'bottom_price': str(breakdown.bottom_price),
+            'undermount_charge': str(breakdown.undermount_charge),
+            'finish_charge': str(breakdown.finish_charge),
+            'surcharge_percent': str(breakdown.surcharge_percent),
+            'price_per_unit': str(breakdown.unit_price),
             'total': str(total),
         })
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
     except Exception as e:
-        return JsonResponse({'error': str(e)}, status=400) 
\ No newline at end of file
+        return JsonResponse({'error': str(e)}, status=400)
@@ -4,7 +4,7 @@ from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 from ..models.door import WoodStock, Design, PanelType, EdgeProfile, PanelRise, Style
 from ..forms import GenericItemForm
-from .common import render_form_with_errors
+from .common import render_form_with_errors, place_session_item
 
 def settings(request):
     """
@@ -94,17 +94,7 @@ def add_generic_item(request):
     if 'items' not in request.session['current_order']:
         request.session['current_order']['items'] = []
 
-    edit_index = request.POST.get('edit_index')
-    if edit_index is not None and edit_index != '':
-        idx = int(edit_index)
-        items = request.session['current_order']['items']
-        if 0 <= idx < len(items):
-            items[idx] = generic_item
-        else:
-            items.append(generic_item)
-    else:
-        request.session['current_order']['items'].append(generic_item)
-    request.session.modified = True
+    place_session_item(request, generic_item)
 
     return render(request, 'door/line_items_table.html', {
         'items': request.session['current_order']['items']
@@ -1,7 +1,9 @@
 import io
+import json
 
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
+from django.db import transaction
 from django.template.loader import render_to_string
 from django.urls import reverse
 from xhtml2pdf import pisa
@@ -9,10 +11,11 @@ from xhtml2pdf import pisa
 from ..forms import OrderForm
 from ..models import Order, DoorLineItem
 from django.http import HttpResponse, JsonResponse
+from django.views.decorators.http import require_http_methods
 from ..models.customer import Customer
 from ..models.door import DoorLineItem
 from itertools import chain
-from ..services.order_service import OrderService
+from ..services.order_service import OrderService, OrderConflictError
 from .common import handle_entity_search, handle_entity_list
 
 
@@ -35,7 +38,7 @@ def orders(request):
     )
 
 def edit_order(request, order_id):
-    order = get_object_or_404(Order, id=order_id)
+    order = get_object_or_404(Order.objects.with_items(), id=order_id)
     is_quote = order.is_quote
     label = _entity_label(is_quote)
     edit_ctx = {
@@ -58,9 +61,15 @@ def edit_order(request, order_id):
                     'items': items, **edit_ctx,
                 }, status=422)
 
-            success, order, error = OrderService.update_from_session(
-                order, form.cleaned_data, session_data
-            )
+            try:
+                success, _, error = OrderService.update_from_session(
+                    order, form.cleaned_data, session_data
+                )
+            except OrderConflictError as e:
+                return render(request, 'order/order_conflict.html', {
+                    'order': order, 'label': label, 'message': str(e),
+                    'title': f'{label} {order.order_number} Changed',
+                }, status=409)
 
             if success:
                 if 'current_order' in request.session:
@@ -205,9 +214,15 @@ def delete_order(request, order_id):
 def convert_to_order(request, order_id):
     order = get_object_or_404(Order.quotes, id=order_id)
     if request.method == 'POST':
-        order.is_quote = False
-        order.save()
-        messages.success(request, 'Quote converted to order successfully!')
+        try:
+            with transaction.atomic():
+                OrderService.claim_version(order)
+                order.is_quote = False
+                order.save()
+        except OrderConflictError as e:
+            messages.error(request, str(e))
+        else:
+            messages.success(request, 'Quote converted to order successfully!')
         if request.headers.get('HX-Request'):
             response = HttpResponse()
             response['HX-Redirect'] = reverse('edit_order', args=[order.id])
@@ -219,6 +234,68 @@ def convert_to_order(request, order_id):
         'title': f'Convert Quote {order.order_number} to Order'
     })
 
+def reprice_order(request, order_id):
+    order = get_object_or_404(Order.objects.with_items(), id=order_id)
+    label = _entity_label(order.is_quote)
+    if request.method == 'POST':
+        try:
+            version = int(request.POST['version'])
+        except (KeyError, ValueError):
+            return HttpResponse("Missing order version", status=400)
+        try:
+            success, _, error = OrderService.reprice_order(order, version)
+        except OrderConflictError as e:
+            messages.error(request, str(e))
+            if request.headers.get('HX-Request'):
+                response = HttpResponse(str(e), status=409)
+                response['HX-Redirect'] = reverse('edit_order', args=[order_id])
+                return response
+            return render(request, 'order/order_conflict.html', {
+                'order': order, 'label': label, 'message': str(e),
+                'title': f'{label} {order.order_number} Changed',
+            }, status=409)
+        if success:
+            messages.success(request, f'{label} repriced with current pricing.')
+        else:
+            messages.error(request, error)
+        if request.headers.get('HX-Request'):
+            response = HttpResponse()
+            response['HX-Redirect'] = reverse('edit_order', args=[order_id])
+            return response
+        return redirect('edit_order', order_id=order_id)
+
+    return render(request, 'order/order_reprice_confirm.html', {
+        'order': order,
+        'label': label,
+        'title': f'Reprice {label} {order.order_number}'
+    })
+
+def duplicate_order(request, order_id):
+    order = get_object_or_404(Order, id=order_id)
+    label = _entity_label(order.is_quote)
+    if request.method == 'POST':
+        as_quote = request.POST.get('as') != 'order'
+        success, duplicate, error = OrderService.duplicate_order(
+            order, as_quote=as_quote, reprice=request.POST.get('reprice') == 'on'
+        )
+        if success:
+            messages.success(request, f'{label} {order.order_number} copied to {_entity_label(as_quote).lower()} {duplicate.order_number}.')
+            url = reverse('edit_order', args=[duplicate.id])
+        else:
+            messages.error(request, error)
+            url = reverse('edit_order', args=[order_id])
+        if request.headers.get('HX-Request'):
+            response = HttpResponse()
+            response['HX-Redirect'] = url
+            return response
+        return redirect(url)
+
+    return render(request, 'order/order_duplicate_confirm.html', {
+        'order': order,
+        'label': label,
+        'title': f'Duplicate {label} {order.order_number}'
+    })
+
 def get_customer_details(request):
     customer_id = request.GET.get('customer')
     if not customer_id:
@@ -328,6 +405,8 @@ def confirm_remove_line_item(request, item_id):
         'delete_title': 'Remove Line Item',
         'delete_message': f'Are you sure you want to remove {item_desc}? This action cannot be undone.',
         'delete_url': reverse('remove_line_item', args=[item_id]),
+        # The order form's hidden version field, for removing saved items
+        'delete_include': '#id_version',
     })
 
 
@@ -359,23 +438,18 @@ def remove_line_item(request, item_id):
         if not order_id:
             return HttpResponse("No active order", status=400)
 
-        order = get_object_or_404(Order, id=order_id)
-        item_removed = False
-
-        if hasattr(order, 'door_items'):
-            door_item = order.door_items.filter(id=item_id).first()
-            if door_item:
-                door_item.delete()
-                item_removed = True
-
-        if not item_removed and hasattr(order, 'drawer_items'):
-            drawer_item = order.drawer_items.filter(id=item_id).first()
-            if drawer_item:
-                drawer_item.delete()
-                item_removed = True
+        # htmx sends DELETE parameters in the query string
+        try:
+            version = int(request.GET['version'])
+        except (KeyError, ValueError):
+            return HttpResponse("Missing order version", status=400)
 
-        if not item_removed:
-            return HttpResponse("Item not found", status=404)
+        order = get_object_or_404(Order, id=order_id)
+        try:
+            if not OrderService.remove_line_item(order, item_id, version):
+                return HttpResponse("Item not found", status=404)
+        except OrderConflictError as e:
+            return HttpResponse(str(e), status=409)
 
         if hasattr(order, 'line_items') and callable(getattr(order, 'line_items')):
             items = order.line_items
@@ -385,6 +459,8 @@ def remove_line_item(request, item_id):
             items = list(chain(door_items_list, drawer_items_list))
 
         response = render(request, 'door/line_items_table.html', {'items': items})
+        # The removal moved the order to its next version; keep the page's form in step
+        response.write(render_to_string('order/partials/version_field_oob.html', {'version': order.version}))
         response['HX-Retarget'] = '.line-items-container'
         response['HX-Reswap'] = 'outerHTML'
         response['HX-Trigger-After-Swap'] = 'closeModal'
@@ -393,17 +469,44 @@ def remove_line_item(request, item_id):
     return redirect('orders')
 
 
+@require_http_methods(["POST"])
+def reprice_line_items(request):
+    """
+    Reprice every line item of the order being edited in one batch and
+    return the updated line items table. Prices the items posted as a JSON
+    'items' list when given, otherwise the session items, which are updated
+    in place. The per-line prices are sent in the HX-Trigger header as the
+    detail of a 'lineItemsRepriced' event.
+    """
+    posted = request.POST.get('items')
+    if posted:
+        try:
+            items = json.loads(posted)
+        except ValueError:
+            return HttpResponse("Invalid items list", status=400)
+        if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+            return HttpResponse("Invalid items list", status=400)
+    else:
+        items = request.session.get('current_order', {}).get('items', [])
+
+    success, prices, error = OrderService.reprice_session_items(items)
+    if not success:
+        return HttpResponse(error, status=400)
+    if not posted and any(price['changed'] for price in prices):
+        request.session.modified = True
+
+    response = render(request, 'door/line_items_table.html', {'items': items})
+    response['HX-Trigger'] = json.dumps({'lineItemsRepriced': {'prices': prices}})
+    return response
+
+
 def generate_order_pdf(request, order_id):
     """Generate a PDF version of the order or quote for printing."""
-    order = get_object_or_404(Order, id=order_id)
+    order = get_object_or_404(Order.objects.with_items(), id=order_id)
 
-    door_items = DoorLineItem.objects.filter(order=order).select_related(
-        'wood_stock', 'edge_profile', 'panel_rise', 'style'
-    )
-    drawer_items = order.drawer_items.all().select_related(
-        'wood_stock', 'bottom'
-    )
-    generic_items = order.generic_items.all()
+    door_items = list(order.door_items.all())
+    drawer_items = list(order.drawer_items.all())
+    generic_items = list(order.generic_items.all())
 
     template = 'pdf/quote_pdf.html' if order.is_quote else 'pdf/order_pdf.html'
     ctx_key = 'quote' if order.is_quote else 'order'
@@ -414,6 +517,8 @@ def generate_order_pdf(request, order_id):
         'door_items': door_items,
         'drawer_items': drawer_items,
         'generic_items': generic_items,
+        'item_total': order.item_total,
+        'subtotal': order.subtotal,
     }
 
     html_string = render_to_string(template, context)
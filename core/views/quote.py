@@ -2,6 +2,8 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from ..models import Order
 from django.http import HttpResponse
+from django.urls import reverse
+from django.views.decorators.http import require_http_methods
 from .common import handle_entity_search, handle_entity_list
 
 
@@ -24,3 +26,28 @@ def quote_search(request):
         'quote/partials/quote_results.html',
         'quotes'
     )
+
+
+@require_http_methods(["POST"])
+def bulk_quote_action(request):
+    """Convert or delete the quotes selected on the quotes list."""
+    from ..services.order_service import OrderService
+
+    quote_ids = [int(pk) for pk in request.POST.getlist('quote_ids') if pk.isdigit()]
+    action = request.POST.get('action')
+    if not quote_ids:
+        messages.error(request, 'Select at least one quote.')
+    elif action == 'convert':
+        count = OrderService.convert_quotes(quote_ids)
+        messages.success(request, f"Converted {count} quote{'s' if count != 1 else ''} to order{'s' if count != 1 else ''}.")
+    elif action == 'delete':
+        count = OrderService.delete_quotes(quote_ids)
+        messages.success(request, f"Deleted {count} quote{'s' if count != 1 else ''}.")
+    else:
+        return HttpResponse('Unknown action', status=400)
+
+    if request.headers.get('HX-Request'):
+        response = HttpResponse()
+        response['HX-Redirect'] = reverse('quotes')
+        return response
+    return redirect('quotes')
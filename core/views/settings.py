@@ -5,6 +5,8 @@ from ..models import Style, PanelType, Design, WoodStock, EdgeProfile, PanelRise
 from django.template.loader import render_to_string
 from django.http import HttpResponse, HttpResponseBadRequest
 from django.urls import reverse
+from ..services.pricing_catalog import bump_catalog_version
+from ..services.settings_registry import invalidate_settings, get_misc_door_settings
 
 
 def _modal_success(request, html, target_id, swap='innerHTML'):
@@ -41,7 +43,7 @@ def door_settings(request):
     panel_rises = PanelRise.objects.all()
     panel_types = PanelType.objects.all()
     rail_defaults = RailDefaults.objects.first()
-    misc_settings = MiscellaneousDoorSettings.objects.first()
+    misc_settings = get_misc_door_settings()
 
     context = {
         'styles': styles,
@@ -112,6 +114,7 @@ def update_wood_stock(request, stock_id):
         try:
             wood.full_clean()
             wood.save()
+            bump_catalog_version()
         except ValidationError as e:
             return render(request, 'settings/partials/wood_stock_row_edit.html', {
                 'wood': wood, 'errors': e.message_dict
@@ -145,6 +148,7 @@ def add_wood_stock(request):
         try:
             wood.full_clean()
             wood.save()
+            bump_catalog_version()
         except ValidationError as e:
             return render(request, 'settings/partials/wood_stock_row_add.html', {
                 'errors': e.message_dict
@@ -170,6 +174,7 @@ def delete_wood_stock(request, stock_id):
 
     if request.method == 'DELETE':
         wood.delete()
+        bump_catalog_version()
         html = _render_tbody(request, WoodStock.objects.all(),
                              'settings/partials/wood_stock_row_display.html', 'wood',
                              'settings/partials/wood_stock_add_button.html')
@@ -221,6 +226,7 @@ def update_door_style(request, style_id):
         try:
             style.full_clean()
             style.save()
+            bump_catalog_version()
         except ValidationError as e:
             return render(request, 'settings/partials/style_row_edit.html', {
                 'style': style,
@@ -278,6 +284,7 @@ def add_door_style(request):
         try:
             style.full_clean()
             style.save()
+            bump_catalog_version()
         except ValidationError as e:
             return render(request, 'settings/partials/style_row_add.html', {
                 'panel_types': PanelType.objects.all(),
@@ -306,6 +313,7 @@ def delete_door_style(request, style_id):
 
     if request.method == 'DELETE':
         style.delete()
+        bump_catalog_version()
         html = _render_tbody(request,
                              Style.objects.all().select_related('panel_type', 'design'),
                              'settings/partials/style_row_display.html', 'style',
@@ -345,6 +353,7 @@ def update_door_design(request, design_id):
         try:
             design.full_clean()
             design.save()
+            bump_catalog_version()
         except ValidationError as e:
             return render(request, 'settings/partials/design_row_edit.html', {
                 'design': design, 'errors': e.message_dict
@@ -376,6 +385,7 @@ def add_door_design(request):
         try:
             design.full_clean()
             design.save()
+            bump_catalog_version()
         except ValidationError as e:
             return render(request, 'settings/partials/door_design_row_add.html', {
                 'errors': e.message_dict
@@ -401,6 +411,7 @@ def delete_door_design(request, design_id):
 
     if request.method == 'DELETE':
         design.delete()
+        bump_catalog_version()
         html = _render_tbody(request, Design.objects.all().order_by('name'),
                              'settings/partials/design_row_display.html', 'design',
                              'settings/partials/door_design_add_button.html')
@@ -517,6 +528,7 @@ def update_panel_rise(request, rise_id):
         try:
             rise.full_clean()
             rise.save()
+            bump_catalog_version()
         except ValidationError as e:
             return render(request, 'settings/partials/panel_rise_row_edit.html', {
                 'rise': rise, 'errors': e.message_dict
@@ -548,6 +560,7 @@ def add_panel_rise(request):
         try:
             rise.full_clean()
             rise.save()
+            bump_catalog_version()
         except ValidationError as e:
             return render(request, 'settings/partials/panel_rise_row_add.html', {
                 'errors': e.message_dict
@@ -573,6 +586,7 @@ def delete_panel_rise(request, rise_id):
 
     if request.method == 'DELETE':
         rise.delete()
+        bump_catalog_version()
         html = _render_tbody(request, PanelRise.objects.all().order_by('name'),
                              'settings/partials/panel_rise_row_display.html', 'rise',
                              'settings/partials/panel_rise_add_button.html')
@@ -616,6 +630,8 @@ def update_panel_type(request, type_id):
         try:
             panel_type.full_clean()
             panel_type.save()
+            bump_catalog_version()
+            invalidate_settings(MiscellaneousDoorSettings)
         except ValidationError as e:
             return render(request, 'settings/partials/panel_type_row_edit.html', {
                 'type': panel_type, 'errors': e.message_dict
@@ -655,6 +671,7 @@ def add_panel_type(request):
         try:
             panel_type.full_clean()
             panel_type.save()
+            bump_catalog_version()
         except ValidationError as e:
             return render(request, 'settings/partials/panel_type_row_add.html', {
                 'errors': e.message_dict
@@ -680,6 +697,7 @@ def delete_panel_type(request, type_id):
 
     if request.method == 'DELETE':
         panel_type.delete()
+        bump_catalog_version()
         html = _render_tbody(request, PanelType.objects.all().order_by('name'),
                              'settings/partials/panel_type_row_display.html', 'type',
                              'settings/partials/panel_type_add_button.html')
@@ -719,6 +737,7 @@ def update_drawer_woodstock(request, stock_id):
         try:
             wood.full_clean()
             wood.save()
+            bump_catalog_version()
         except ValidationError as e:
             return render(request, 'settings/partials/drawer_woodstock_row_edit.html', {
                 'wood': wood, 'errors': e.message_dict
@@ -753,6 +772,7 @@ def add_drawer_woodstock(request):
         try:
             wood.full_clean()
             wood.save()
+            bump_catalog_version()
         except ValidationError as e:
             return render(request, 'settings/partials/drawer_woodstock_row_add.html', {
                 'errors': e.message_dict
@@ -780,6 +800,7 @@ def delete_drawer_woodstock(request, stock_id):
 
     if request.method == 'DELETE':
         wood.delete()
+        bump_catalog_version()
         html = _render_tbody(request, DrawerWoodStock.objects.all(),
                              'settings/partials/drawer_woodstock_row_display.html', 'wood',
                              'settings/partials/drawer_woodstock_add_button.html')
@@ -820,6 +841,7 @@ def update_drawer_bottom(request, bottom_id):
         try:
             bottom.full_clean()
             bottom.save()
+            bump_catalog_version()
         except ValidationError as e:
             return render(request, 'settings/partials/drawer_bottom_row_edit.html', {
                 'bottom': bottom, 'errors': e.message_dict
@@ -855,6 +877,7 @@ def add_drawer_bottom(request):
         try:
             bottom.full_clean()
             bottom.save()
+            bump_catalog_version()
         except ValidationError as e:
             return render(request, 'settings/partials/drawer_bottom_row_add.html', {
                 'errors': e.message_dict
@@ -882,6 +905,7 @@ def delete_drawer_bottom(request, bottom_id):
 
     if request.method == 'DELETE':
         bottom.delete()
+        bump_catalog_version()
         html = _render_tbody(request, DrawerBottomSize.objects.all(),
                              'settings/partials/drawer_bottom_row_display.html', 'bottom',
                              'settings/partials/drawer_bottom_add_button.html')
@@ -921,6 +945,7 @@ def update_drawer_pricing(request, pricing_id):
         try:
             pricing.full_clean()
             pricing.save()
+            bump_catalog_version()
         except ValidationError as e:
             return render(request, 'settings/partials/drawer_pricing_row_edit.html', {
                 'pricing': pricing, 'errors': e.message_dict
@@ -955,6 +980,7 @@ def add_drawer_pricing(request):
         try:
             pricing.full_clean()
             pricing.save()
+            bump_catalog_version()
         except ValidationError as e:
             return render(request, 'settings/partials/drawer_pricing_row_add.html', {
                 'errors': e.message_dict
@@ -982,6 +1008,7 @@ def delete_drawer_pricing(request, pricing_id):
 
     if request.method == 'DELETE':
         pricing.delete()
+        bump_catalog_version()
         html = _render_tbody(request, DrawerPricing.objects.all(),
                              'settings/partials/drawer_pricing_row_display.html', 'pricing',
                              'settings/partials/drawer_pricing_add_button.html')
@@ -1022,6 +1049,7 @@ def update_drawer_dim_surcharge(request, surcharge_id):
         try:
             surcharge.full_clean()
             surcharge.save()
+            bump_catalog_version()
         except ValidationError as e:
             return render(request, 'settings/partials/drawer_dim_surcharge_row_edit.html', {
                 'surcharge': surcharge, 'errors': e.message_dict
@@ -1057,6 +1085,7 @@ def add_drawer_dim_surcharge(request):
         try:
             surcharge.full_clean()
             surcharge.save()
+            bump_catalog_version()
         except ValidationError as e:
             return render(request, 'settings/partials/drawer_dim_surcharge_row_add.html', {
                 'errors': e.message_dict
@@ -1084,6 +1113,7 @@ def delete_drawer_dim_surcharge(request, surcharge_id):
 
     if request.method == 'DELETE':
         surcharge.delete()
+        bump_catalog_version()
         html = _render_tbody(request, DrawerDimensionSurcharge.objects.all(),
                              'settings/partials/drawer_dim_surcharge_row_display.html', 'surcharge',
                              'settings/partials/drawer_dim_surcharge_add_button.html')
@@ -1134,6 +1164,7 @@ def update_rail_defaults(request):
             defaults.interior_rail_size = Decimal(request.POST.get('interior_rail_size', '2.50'))
             defaults.full_clean()
             defaults.save()
+            invalidate_settings(RailDefaults)
         except (ValidationError, ValueError) as e:
             if isinstance(e, ValidationError):
                 errors = e.message_dict
@@ -1155,7 +1186,7 @@ def update_rail_defaults(request):
 # ── Miscellaneous Door Settings (edit only) ───────────────────────────
 
 def edit_misc_settings(request):
-    settings = MiscellaneousDoorSettings.objects.first()
+    settings = get_misc_door_settings()
     panel_types = PanelType.objects.all()
     if not settings:
         settings = MiscellaneousDoorSettings.objects.create(
@@ -1169,7 +1200,7 @@ def edit_misc_settings(request):
 
 
 def get_misc_settings(request):
-    settings = MiscellaneousDoorSettings.objects.first()
+    settings = get_misc_door_settings()
     if not settings:
         settings = MiscellaneousDoorSettings.objects.create(
             extra_height=Decimal('0.125'), extra_width=Decimal('0.125'),
@@ -1199,6 +1230,7 @@ def update_misc_settings(request):
             settings.drawer_slab_id = request.POST.get('drawer_slab')
             settings.full_clean()
             settings.save()
+            invalidate_settings(MiscellaneousDoorSettings)
         except (ValidationError, InvalidOperation) as e:
             if isinstance(e, ValidationError):
                 errors = e.message_dict
@@ -1249,6 +1281,8 @@ def update_drawer_defaults(request):
         defaults.sides_cutting_adjustment = request.POST.get('sides_cutting_adjustment', 0.000)
         defaults.plywood_size_adjustment = request.POST.get('plywood_size_adjustment', 0.000)
         defaults.save()
+        invalidate_settings(DefaultDrawerSettings)
+        bump_catalog_version()
 
         response = render(request, 'settings/partials/drawer_defaults_row_display.html', {'defaults': defaults})
         response['HX-Retarget'] = '#drawer-defaults-content'
@@ -1257,3 +1291,61 @@ def update_drawer_defaults(request):
         return response
 
     return HttpResponseBadRequest("Invalid request method")
+
+
+# ── Pricing simulator ─────────────────────────────────────────────────
+
+
+def pricing_simulator(request):
+    """
+    What-if repricing tool: applies proposed pricing changes to every door and
+    drawer on open quotes and recent orders and reports the revenue impact.
+    The form is submitted with hx-get and only the form and results panel is returned.
+    """
+    from ..forms import PricingSimulationForm
+    from ..services.pricing_simulator import simulate_repricing
+
+    form = PricingSimulationForm(request.GET or None)
+    result = None
+    if form.is_valid():
+        result = simulate_repricing(form.scenario(), months=form.cleaned_data['months'])
+
+    context = {'form': form, 'result': result, 'title': 'Pricing Simulator'}
+    if request.headers.get('HX-Request'):
+        return render(request, 'settings/partials/pricing_simulator_panel.html', context)
+    return render(request, 'settings/pricing_simulator.html', context)
+
+
+# ── Price lists ───────────────────────────────────────────────────────
+
+
+def price_sheet(request):
+    """
+    Printable door or drawer price list over a grid of sizes, downloaded as a
+    PDF or CSV. The form submits with a plain GET; until it is valid the form
+    page is shown with its errors.
+    """
+    import io
+    from xhtml2pdf import pisa
+    from ..forms import PriceSheetForm
+    from ..services.price_sheet import price_sheet_csv
+
+    form = PriceSheetForm(request.GET or None)
+    if form.is_valid():
+        sheet = form.price_sheet()
+        filename = f"{form.cleaned_data['sheet']}-price-list-{sheet.generated:%Y-%m-%d}"
+        if form.cleaned_data['format'] == 'csv':
+            response = HttpResponse(price_sheet_csv(sheet), content_type='text/csv')
+            response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+            return response
+
+        html_string = render_to_string('pdf/price_sheet_pdf.html', {'sheet': sheet})
+        result = io.BytesIO()
+        pdf = pisa.pisaDocument(io.BytesIO(html_string.encode("UTF-8")), result)
+        if pdf.err:
+            return HttpResponse('Error generating PDF', status=500)
+        response = HttpResponse(result.getvalue(), content_type='application/pdf')
+        response['Content-Disposition'] = f'attachment; filename="{filename}.pdf"'
+        return response
+
+    return render(request, 'settings/price_sheet.html', {'form': form, 'title': 'Price Lists'})
@@ -67,6 +67,9 @@ packages = [
     'pyphen',
     'pydyf',
 
+    # Pricing simulator
+    'numpy',
+
     # Standard library modules that Django / Waitress import dynamically
     'encodings',
     'email',
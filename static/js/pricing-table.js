@@ -0,0 +1,177 @@
+/*
+ * Client-side price previews for the door and drawer forms.
+ *
+ * Evaluates the fixed-point pricing table served by the pricing_table view
+ * (FixedPointKernel.as_table) with BigInt arithmetic, mirroring
+ * FixedPointKernel.door_cents / drawer_cents exactly. Every function returns
+ * null when it cannot give the server's answer (table not loaded, unknown
+ * row, off-grid input, inexact half-cent tie); the forms then fall back to
+ * the calculate-price endpoints. Prices are always recalculated server-side
+ * when an item is added.
+ */
+(function() {
+    let table = null;
+    let units = null;
+
+    function load(url) {
+        // The view answers 304 until pricing settings change, so reloading
+        // on every form open is cheap and keeps the table current.
+        return fetch(url, { credentials: 'same-origin' })
+            .then(function(r) { return r.ok ? r.json() : null; })
+            .then(function(data) {
+                if (!data) return;
+                table = data;
+                units = {
+                    inch: BigInt(data.units.inch),
+                    dollar: BigInt(data.units.dollar),
+                    percent: BigInt(data.units.percent),
+                    sqFt: BigInt(data.units.sq_ft),
+                };
+            })
+            .catch(function() {});
+    }
+
+    // Parse a plain decimal string into an integer count of 1/scale units,
+    // or null if it has more decimal places than the scale allows.
+    function toFixed(value, scale) {
+        const match = /^\s*(\d*)(?:\.(\d*))?\s*$/.exec(value == null ? '' : String(value));
+        if (!match || (!match[1] && !match[2])) return null;
+        const places = scale.toString().length - 1;
+        const fraction = (match[2] || '').replace(/0+$/, '');
+        if (fraction.length > places) return null;
+        return BigInt((match[1] || '0') + fraction.padEnd(places, '0'));
+    }
+
+    // numerator / denominator (in dollar units) to whole cents, half-even.
+    function roundCents(numerator, denominator, exact) {
+        const unit = denominator * (units.dollar / 100n);
+        let cents = numerator / unit;
+        const twice = (numerator % unit) * 2n;
+        if (twice > unit) {
+            cents += 1n;
+        } else if (twice === unit) {
+            if (!exact) return null;
+            if (cents % 2n === 1n) cents += 1n;
+        }
+        return cents;
+    }
+
+    function formatFixed(value, scale) {
+        const places = scale.toString().length - 1;
+        const digits = value.toString().padStart(places + 1, '0');
+        return digits.slice(0, -places) + '.' + digits.slice(-places);
+    }
+
+    function lookup(map, id) {
+        return Object.prototype.hasOwnProperty.call(map, id) ? map[id] : undefined;
+    }
+
+    function doorCents(vals) {
+        if (!table) return null;
+        const doors = table.doors;
+        const style = lookup(doors.styles, vals.style);
+        const wood = lookup(doors.wood_stocks, vals.wood_stock);
+        const rise = vals.panel_rise ? lookup(doors.panel_rises, vals.panel_rise) : 0;
+        const width = toFixed(vals.width, units.inch);
+        const height = toFixed(vals.height, units.inch);
+        if (!style || !wood || rise === undefined || width === null || height === null) return null;
+
+        const designCharge = BigInt(style[0]);
+        const minimumSqFt = BigInt(style[1]);
+        const surchargeWidth = BigInt(style[2]);
+        const surchargeHeight = BigInt(style[3]);
+        const surchargePercent = BigInt(style[4]);
+        const material = BigInt(style[5] ? wood[1] : wood[0]);
+        const sqFtArea = 144n * units.inch * units.inch;
+
+        const area = width * height;
+        let numerator, denominator, exact;
+        if (minimumSqFt && area * units.sqFt < minimumSqFt * sqFtArea) {
+            numerator = designCharge * units.sqFt + minimumSqFt * material;
+            denominator = units.sqFt;
+            exact = true;
+        } else {
+            numerator = designCharge * sqFtArea + area * material;
+            denominator = sqFtArea;
+            exact = area % 9n === 0n;
+        }
+
+        if (surchargePercent && ((surchargeWidth && width > surchargeWidth)
+                || (surchargeHeight && height > surchargeHeight))) {
+            numerator *= 100n * units.percent + surchargePercent;
+            denominator *= 100n * units.percent;
+        }
+
+        numerator += BigInt(rise) * denominator;
+        return roundCents(numerator, denominator, exact);
+    }
+
+    function drawerPrices(vals) {
+        if (!table || !table.drawers) return null;
+        const drawers = table.drawers;
+        const wood = lookup(drawers.wood_stocks, vals.wood_stock);
+        const bottom = lookup(drawers.bottoms, vals.bottom);
+        const width = toFixed(vals.width, units.inch);
+        const height = toFixed(vals.height, units.inch);
+        const depth = toFixed(vals.depth, units.inch);
+        if (wood === undefined || bottom === undefined
+                || width === null || height === null || depth === null) return null;
+
+        let base = BigInt(wood) + BigInt(bottom);
+        if (drawers.tiers.length) {
+            let tierPrice = drawers.tiers[drawers.tiers.length - 1][1];
+            for (const tier of drawers.tiers) {
+                if (BigInt(tier[0]) >= height) {
+                    tierPrice = tier[1];
+                    break;
+                }
+            }
+            base += BigInt(tierPrice);
+        }
+        if (vals.undermount === '1') base += BigInt(drawers.undermount_charge);
+        if (vals.finishing === '1') base += BigInt(drawers.finish_charge);
+
+        let surcharge = null;
+        for (const row of drawers.surcharges) {
+            const rowWidth = BigInt(row[0]), rowDepth = BigInt(row[1]), percent = BigInt(row[2]);
+            if ((rowWidth > 0n && rowWidth <= width) || (rowDepth > 0n && rowDepth <= depth)) {
+                if (surcharge === null || percent > surcharge) surcharge = percent;
+            }
+        }
+
+        const cents = surcharge === null
+            ? roundCents(base, 1n, true)
+            : roundCents(base * (100n * units.percent + surcharge), 100n * units.percent, true);
+        return {
+            // Rates are stored to the cent, so the base price normally is too.
+            base_price: base % 100n === 0n ? formatFixed(base / 100n, 100n) : formatFixed(base, units.dollar),
+            surcharge_percent: formatFixed(surcharge || 0n, units.percent),
+            cents: cents,
+        };
+    }
+
+    function withTotal(result, cents, quantity) {
+        const qty = /^\s*\d+\s*$/.test(quantity || '') ? BigInt(quantity) : 1n;
+        result.price_per_unit = formatFixed(cents, 100n);
+        result.total = formatFixed(cents * qty, 100n);
+        return result;
+    }
+
+    window.PricingTable = {
+        load: load,
+        isLoaded: function() { return table !== null; },
+        // Same shape as the calculate_door_price response, or null.
+        priceDoor: function(vals) {
+            const cents = doorCents(vals);
+            return cents === null ? null : withTotal({}, cents, vals.quantity);
+        },
+        // Same shape as the calculate_drawer_price response, or null.
+        priceDrawer: function(vals) {
+            const prices = drawerPrices(vals);
+            if (prices === null) return null;
+            const cents = prices.cents;
+            delete prices.cents;
+            return withTotal(prices, cents, vals.quantity);
+        },
+    };
+})();